@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Batch color extraction that spreads images across a pool of worker processes.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from color_sampling import decode_image, extract_colors_from_image, sample_colors, sampling_params
+from dominant_colors import cluster_colors, dominant_params, image_region_pixels
+from extraction_cache import cache_key, get_colors, get_dominant, put_colors, put_dominant
+from metrics import timer
+
+def default_workers():
+    """Return the default number of worker processes (one per CPU core)."""
+    return os.cpu_count() or 1
+
+def _extract_all(image_paths, workers, extract):
+    """Yield extract(image_path) for each image path in order, using a pool if worthwhile."""
+    if workers <= 1 or len(image_paths) <= 1:
+        for image_path in image_paths:
+            yield extract(image_path)
+        return
+
+    # Hand out small chunks so slow images don't hold up a whole worker queue
+    chunksize = max(1, len(image_paths) // (workers * 4))
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for colors in executor.map(extract, image_paths, chunksize=chunksize):
+            yield colors
+
+def extract_image(image_path, decode_scale=1, dominant=0):
+    """Return (left_color, top_color, dominant_colors) for an image, decoding it once.
+
+    The dominant colors are clustered from the same decoded image as the
+    point samples, and are [] unless dominant gives the number to extract.
+    """
+    if not dominant:
+        return (*extract_colors_from_image(image_path, decode_scale=decode_scale), [])
+
+    try:
+        with timer('extract'):
+            image, full_size = decode_image(image_path, decode_scale)
+            with image:
+                left_color, top_color = sample_colors(image, full_size)
+                return left_color, top_color, cluster_colors(image_region_pixels(image), dominant)
+    except Exception as e:
+        print(f"Error processing {image_path}: {e}")
+        return None, None, []
+
+def extract_batch(image_paths, workers=1, cache=None, decode_scale=1, dominant=0):
+    """Yield (left_color, top_color, dominant_colors) for each image path, in input order.
+
+    Results are streamed back as soon as the next image in order is done,
+    so callers can report progress while the pool keeps working. When a
+    cache dict from extraction_cache.load_cache() is given, unchanged images
+    are served from it and only new or changed images are extracted; new
+    results are added to the dict for the caller to save. decode_scale is
+    passed to extract_colors_from_image to decode at reduced resolution.
+    With dominant=K the K dominant colors of each image are computed by the
+    same worker from the same decode, and cached under their own k-means
+    parameters; otherwise dominant_colors is [].
+    """
+    image_paths = list(image_paths)
+
+    extract = partial(extract_image, decode_scale=decode_scale, dominant=dominant)
+
+    if cache is None:
+        yield from _extract_all(image_paths, workers, extract)
+        return
+
+    params = sampling_params(decode_scale=decode_scale)
+    keys = [cache_key(image_path, params) for image_path in image_paths]
+    cached = [get_colors(cache, key) for key in keys]
+
+    if dominant:
+        params = dominant_params(dominant, decode_scale=decode_scale)
+        dominant_keys = [cache_key(image_path, params) for image_path in image_paths]
+        cached_dominant = [get_dominant(cache, key) for key in dominant_keys]
+    else:
+        dominant_keys = [None] * len(image_paths)
+        cached_dominant = [[]] * len(image_paths)
+
+    misses = [image_path for image_path, colors, dominant_colors in zip(image_paths, cached, cached_dominant)
+              if colors is None or dominant_colors is None]
+    extracted = _extract_all(misses, workers, extract)
+
+    for key, colors, dominant_key, dominant_colors in zip(keys, cached, dominant_keys, cached_dominant):
+        if colors is None or dominant_colors is None:
+            left_color, top_color, dominant_colors = next(extracted)
+            colors = (left_color, top_color)
+            put_colors(cache, key, *colors)
+            put_dominant(cache, dominant_key, dominant_colors)
+        yield (*colors, dominant_colors)
@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for color extraction, catalog parsing, image downloads and SVG rendering.
+
+A synthetic corpus is generated first: N noisy tile JPEGs of a configurable
+size, a mayco-product catalog page with the same markup as the saved Mayco
+pages, and color CSVs for the SVG renderers. Downloads are served by a local
+HTTP server standing in for the Mayco site, so results do not depend on the
+network. Each benchmark runs in a fresh process that imports its modules
+first, so its memory is reported as the peak RSS it adds above that import
+footprint, and the best of --repeat runs is reported as items/sec and MB/s.
+
+Results can be saved as a JSON baseline and later runs compared against it:
+
+    python benchmark.py --save bench_baseline.json
+    python benchmark.py --compare bench_baseline.json
+"""
+
+import argparse
+import contextlib
+import csv
+import importlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+from PIL import Image
+
+BENCHMARKS = ('extract', 'parse_lxml', 'parse_soup', 'download',
+              'underglaze_svg', 'underglaze_compact_svg', 'glaze_compact_svg')
+DEFAULT_IMAGES = 50
+DEFAULT_IMAGE_SIZE = 800
+DEFAULT_PRODUCTS = 2000
+DEFAULT_THRESHOLD = 0.10
+
+PRODUCT_TEMPLATE = """                            <div class="mayco-product">
+            <a href="#!" data-toggle="modal" data-target="#modal-{index}">
+                <img src="{image_url}" class="product-featured-image img-fluid">
+                <br>
+                {code}							<br>
+                {name}							<br>
+                                                                            <small><em>(Cone {cone})</em></small>
+                                        </a>
+        </div>
+        <div class="modal fade" id="modal-{index}" tabindex="-1" role="dialog" aria-hidden="true">
+            <div class="modal-dialog modal-dialog-centered modal-lg" role="document">
+                <div class="modal-content">
+                    <div class="modal-body">
+                        <div class="modal-left"><img src="{image_url}" class="img-fluid"></div>
+                        <div class="modal-right">
+                            <h3 class="modal-product-title">{code} - {name}</h3>
+                        </div>
+                    </div>
+                </div>
+            </div>
+        </div>
+"""
+
+def make_images(directory, count, size, seed=0):
+    """Write count synthetic tile JPEGs and return their paths."""
+    rng = np.random.default_rng(seed)
+    os.makedirs(directory, exist_ok=True)
+
+    paths = []
+    for i in range(count):
+        base = rng.integers(0, 256, 3)
+        noise = rng.normal(0, 12, (size, size, 3))
+        gradient = np.linspace(-20, 20, size)[:, None, None]
+        pixels = np.clip(base + noise + gradient, 0, 255).astype(np.uint8)
+
+        path = os.path.join(directory, f"sc_{i}_cone06.jpg")
+        Image.fromarray(pixels).save(path, quality=90)
+        paths.append(path)
+    return paths
+
+def make_catalog_page(path, count, base_url='https://www.maycocolors.com/wp-content/uploads'):
+    """Write a synthetic catalog page with count mayco-product entries."""
+    cones = ('06', '6', '10')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<html><body><div class="products">\n')
+        for i in range(count):
+            f.write(PRODUCT_TEMPLATE.format(
+                index=i, code=f"SC-{i}", name=f"Color {i}", cone=cones[i % len(cones)],
+                image_url=f"{base_url}/sc-{i}.jpg"
+            ))
+        f.write('</div></body></html>\n')
+
+def make_color_csv(path, count, seed=0):
+    """Write a synthetic extracted colors CSV with count rows."""
+    rng = np.random.default_rng(seed)
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['code', 'color_name', 'left_color_hex', 'top_color_hex', 'left_color_rgb', 'top_color_rgb'])
+        for i in range(count):
+            left, top = rng.integers(0, 256, (2, 3))
+            writer.writerow([
+                f"SC-{i}", f"Color {i}",
+                '#' + bytes(left.astype(np.uint8)).hex(), '#' + bytes(top.astype(np.uint8)).hex(),
+                f"({left[0]}, {left[1]}, {left[2]})", f"({top[0]}, {top[1]}, {top[2]})"
+            ])
+
+def make_corpus(directory, images=DEFAULT_IMAGES, image_size=DEFAULT_IMAGE_SIZE, products=DEFAULT_PRODUCTS):
+    """Generate the full benchmark corpus in a directory and return its file layout."""
+    corpus = {
+        'images': make_images(os.path.join(directory, 'images'), images, image_size),
+        'catalog_page': os.path.join(directory, 'catalog.html'),
+        'color_csv': os.path.join(directory, 'colors.csv')
+    }
+    make_catalog_page(corpus['catalog_page'], products)
+    make_color_csv(corpus['color_csv'], products)
+    return corpus
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    """Static file handler that does not log every request."""
+
+    def log_message(self, format, *args):
+        pass
+
+@contextlib.contextmanager
+def serve_directory(directory):
+    """Serve a directory over HTTP on a free local port and yield its base URL."""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), partial(QuietHandler, directory=directory))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def peak_rss_mb():
+    """Return this process's peak resident set size in MB.
+
+    On Linux ru_maxrss keeps the parent's peak across fork and exec, so the
+    spawned benchmark processes read VmHWM, which starts afresh at exec.
+    """
+    try:
+        with open('/proc/self/status', 'r', encoding='ascii') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def file_size(paths):
+    """Return the total size in bytes of a list of files."""
+    return sum(os.path.getsize(path) for path in paths)
+
+def bench_extract(corpus, base_url, scratch):
+    """Time extract_colors_from_image over every corpus image."""
+    from color_sampling import extract_colors_from_image
+
+    for image_path in corpus['images']:
+        extract_colors_from_image(image_path)
+    return len(corpus['images']), file_size(corpus['images'])
+
+def bench_parse(corpus, base_url, scratch, use_lxml=True):
+    """Time parse_products on the synthetic catalog page with or without lxml."""
+    import catalog_parser
+
+    if not use_lxml:
+        catalog_parser.etree = None
+    elif catalog_parser.etree is None:
+        return None
+
+    products = catalog_parser.parse_products(corpus['catalog_page'])
+    return len(products), file_size([corpus['catalog_page']])
+
+def bench_download(corpus, base_url, scratch):
+    """Time download_images fetching every corpus image from the local server."""
+    from image_downloader import download_images
+
+    target = os.path.join(scratch, 'downloads')
+    shutil.rmtree(target, ignore_errors=True)
+    jobs = [
+        (f"{base_url}/images/{os.path.basename(path)}", os.path.join(target, os.path.basename(path)))
+        for path in corpus['images']
+    ]
+    download_images(jobs, requests_per_second=0, metadata_file=None)
+    return len(jobs), file_size([local_path for _, local_path in jobs])
+
+def bench_svg(corpus, base_url, scratch, module, function):
+    """Time one SVG renderer on the synthetic color CSV."""
+    render = getattr(__import__(module), function)
+
+    output_file = os.path.join(scratch, f"{module}.svg")
+    render(corpus['color_csv'], output_file)
+    with open(corpus['color_csv'], 'r', encoding='utf-8') as f:
+        rows = sum(1 for _ in csv.DictReader(f))
+    return rows, file_size([output_file])
+
+# Modules each benchmark imports, loaded before its RSS baseline is taken
+BENCHMARK_IMPORTS = {
+    'extract': ['color_sampling'],
+    'parse_lxml': ['catalog_parser'],
+    'parse_soup': ['catalog_parser'],
+    'download': ['image_downloader'],
+    'underglaze_svg': ['create_color_svg'],
+    'underglaze_compact_svg': ['create_compact_svg'],
+    'glaze_compact_svg': ['create_glaze_compact_svg']
+}
+
+BENCHMARK_FUNCTIONS = {
+    'extract': bench_extract,
+    'parse_lxml': partial(bench_parse, use_lxml=True),
+    'parse_soup': partial(bench_parse, use_lxml=False),
+    'download': bench_download,
+    'underglaze_svg': partial(bench_svg, module='create_color_svg', function='create_svg_page'),
+    'underglaze_compact_svg': partial(bench_svg, module='create_compact_svg', function='create_compact_svg'),
+    'glaze_compact_svg': partial(bench_svg, module='create_glaze_compact_svg', function='create_compact_svg')
+}
+
+def run_benchmark(name, corpus, base_url, scratch, repeat):
+    """Run one benchmark repeat times in this process and return its best result."""
+    benchmark = BENCHMARK_FUNCTIONS[name]
+    best = None
+
+    # The peak only counts what the benchmark adds over its imports
+    for module in BENCHMARK_IMPORTS[name]:
+        importlib.import_module(module)
+    import_rss = peak_rss_mb()
+
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            measured = benchmark(corpus, base_url, scratch)
+            elapsed = time.perf_counter() - start
+        if measured is None:
+            return None
+        if best is None or elapsed < best[0]:
+            best = (elapsed,) + measured
+
+    seconds, items, size = best
+    return {
+        'seconds': round(seconds, 6),
+        'items': items,
+        'bytes': size,
+        'items_per_sec': round(items / seconds, 2),
+        'mb_per_sec': round(size / seconds / (1024 * 1024), 3),
+        'import_rss_mb': round(import_rss, 1),
+        'peak_rss_mb': round(peak_rss_mb() - import_rss, 1)
+    }
+
+def run_suite(names, corpus, scratch, repeat):
+    """Run each benchmark in a fresh process against the local server and return the results."""
+    context = multiprocessing.get_context('spawn')
+    results = {}
+
+    with serve_directory(os.path.dirname(corpus['catalog_page'])) as base_url:
+        for name in names:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                result = executor.submit(run_benchmark, name, corpus, base_url, scratch, repeat).result()
+            if result is None:
+                print(f"{name:<24} skipped")
+                continue
+            results[name] = result
+            print(f"{name:<24} {result['items_per_sec']:>10.1f} items/s {result['mb_per_sec']:>9.2f} MB/s "
+                  f"{result['peak_rss_mb']:>8.1f} MB peak RSS over {result['import_rss_mb']:.1f} MB of imports")
+
+    return results
+
+def compare_results(baseline, results, threshold=DEFAULT_THRESHOLD):
+    """Print throughput changes against a baseline and return the names that regressed."""
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get('results', {}).get(name)
+        if not before:
+            print(f"{name:<24} no baseline")
+            continue
+
+        change = result['items_per_sec'] / before['items_per_sec'] - 1
+        flag = ''
+        if change < -threshold:
+            flag = '  REGRESSION'
+            regressions.append(name)
+
+        # Baselines saved before import_rss_mb existed hold the whole process peak
+        if 'import_rss_mb' in before:
+            rss = f"{result['peak_rss_mb'] - before['peak_rss_mb']:+8.1f} MB peak RSS"
+        else:
+            rss = '     n/a peak RSS'
+        print(f"{name:<24} {change:+8.1%} throughput {rss}{flag}")
+    return regressions
+
+def main():
+    """Main function to run the benchmark suite."""
+    parser = argparse.ArgumentParser(description=__doc__.strip(), formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('benchmarks', nargs='*',
+                        help=f"Benchmarks to run (default: all). Benchmarks: {', '.join(BENCHMARKS)}")
+    parser.add_argument('--images', type=int, default=DEFAULT_IMAGES,
+                        help=f'Number of synthetic JPEGs (default: {DEFAULT_IMAGES})')
+    parser.add_argument('--image-size', type=int, default=DEFAULT_IMAGE_SIZE,
+                        help=f'Width and height of each JPEG in pixels (default: {DEFAULT_IMAGE_SIZE})')
+    parser.add_argument('--products', type=int, default=DEFAULT_PRODUCTS,
+                        help=f'Products in the synthetic catalog page and color CSV (default: {DEFAULT_PRODUCTS})')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per benchmark, best is reported (default: 3)')
+    parser.add_argument('--corpus-dir', help='Keep the generated corpus in this directory instead of a temp dir')
+    parser.add_argument('--save', metavar='FILE', help='Save the results as a JSON baseline')
+    parser.add_argument('--compare', metavar='FILE', help='Compare the results against a saved baseline')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f'Throughput drop that counts as a regression (default: {DEFAULT_THRESHOLD})')
+    args = parser.parse_args()
+
+    names = args.benchmarks or list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+
+    with tempfile.TemporaryDirectory() as scratch:
+        corpus_dir = args.corpus_dir or os.path.join(scratch, 'corpus')
+        print(f"Generating corpus: {args.images} images of {args.image_size}px, {args.products} products...")
+        corpus = make_corpus(corpus_dir, args.images, args.image_size, args.products)
+        results = run_suite(names, corpus, scratch, args.repeat)
+
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'corpus': {'images': args.images, 'image_size': args.image_size, 'products': args.products},
+        'results': results
+    }
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"Baseline saved: {args.save}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('corpus') != report['corpus']:
+            print(f"Warning: baseline corpus {baseline.get('corpus')} differs from this run")
+        regressions = compare_results(baseline, results, args.threshold)
+        if regressions:
+            print(f"Regressed: {', '.join(regressions)}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
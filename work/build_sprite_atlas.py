@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Script to pack every swatch image in colors.json into sprite atlases with a JSON manifest.
+
+Swatches are scaled to a fixed height and placed with a shelf packer: sprites
+are sorted by height and laid out left to right in rows ("shelves") until the
+atlas width is reached, then a new shelf starts below. When an atlas is full
+a new one is started. The manifest maps each color id to its atlas and
+sprite rectangle so the front end can draw hundreds of swatch cells from one
+or a few cached downloads.
+"""
+
+import argparse
+import json
+import os
+
+from PIL import Image
+
+from build_thumbnails import DISPLAY_WIDTH, thumbnail_path
+
+DEFAULT_OUTPUT_DIR = 'sprites'
+DEFAULT_SPRITE_HEIGHT = 64
+DEFAULT_ATLAS_SIZE = 2048
+PADDING = 1
+
+def source_image(color):
+    """Return the best local image for a color: its thumbnail if built, else the original."""
+    image = color.get('image')
+    if image and os.path.exists(thumbnail_path(image, DISPLAY_WIDTH, 'jpg')):
+        return thumbnail_path(image, DISPLAY_WIDTH, 'jpg')
+    if color.get('thumbnail') and os.path.exists(color['thumbnail']):
+        return color['thumbnail']
+    if image and os.path.exists(image):
+        return image
+    return None
+
+def load_sprites(colors_file, sprite_height):
+    """Load and scale the swatch image of every color, returning (id, image) pairs."""
+    with open(colors_file, 'r', encoding='utf-8') as f:
+        colors_data = json.load(f)
+
+    sprites = []
+    for color in colors_data.get('glazes', []) + colors_data.get('underglazes', []):
+        path = source_image(color)
+        if not path:
+            print(f"No image for {color['id']}, skipping")
+            continue
+        with Image.open(path) as image:
+            width = max(1, round(image.width * sprite_height / image.height))
+            sprites.append((color['id'], image.convert('RGB').resize((width, sprite_height), Image.LANCZOS)))
+    return sprites
+
+def pack_shelves(sizes, atlas_size):
+    """Place (width, height) rectangles on shelves and return (atlas, x, y) per rectangle in input order."""
+    order = sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0]))
+    placements = [None] * len(sizes)
+
+    atlas = 0
+    x = y = shelf_height = 0
+    for i in order:
+        width, height = sizes[i]
+        if width > atlas_size or height > atlas_size:
+            raise ValueError(f"Sprite of {width}x{height} does not fit in a {atlas_size}px atlas")
+
+        # Start a new shelf when this row is full, and a new atlas when the shelves are
+        if x + width > atlas_size:
+            x, y, shelf_height = 0, y + shelf_height + PADDING, 0
+        if y + height > atlas_size:
+            atlas, x, y, shelf_height = atlas + 1, 0, 0, 0
+
+        placements[i] = (atlas, x, y)
+        x += width + PADDING
+        shelf_height = max(shelf_height, height)
+
+    return placements
+
+def build_atlases(sprites, output_dir, atlas_size, image_format='webp', quality=85):
+    """Pack sprites into atlas images and return the manifest dict."""
+    sizes = [image.size for _, image in sprites]
+    placements = pack_shelves(sizes, atlas_size)
+
+    # Crop each atlas to the area actually used
+    extents = {}
+    for (width, height), (atlas, x, y) in zip(sizes, placements):
+        used_width, used_height = extents.get(atlas, (0, 0))
+        extents[atlas] = (max(used_width, x + width), max(used_height, y + height))
+
+    os.makedirs(output_dir, exist_ok=True)
+    atlases = [Image.new('RGB', extents[atlas], 'white') for atlas in sorted(extents)]
+
+    manifest = {'atlases': [], 'sprites': {}}
+    for (color_id, image), (atlas, x, y) in zip(sprites, placements):
+        atlases[atlas].paste(image, (x, y))
+        manifest['sprites'][color_id] = {'atlas': atlas, 'x': x, 'y': y, 'w': image.width, 'h': image.height}
+
+    for index, atlas_image in enumerate(atlases):
+        filename = f"atlas-{index}.{image_format}"
+        atlas_image.save(os.path.join(output_dir, filename), quality=quality)
+        manifest['atlases'].append({'file': filename, 'width': atlas_image.width, 'height': atlas_image.height})
+
+    with open(os.path.join(output_dir, 'atlas.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, separators=(',', ':'), sort_keys=True)
+
+    return manifest
+
+def main():
+    """Main function to build sprite atlases from colors.json."""
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--colors', default='colors.json',
+                        help='Catalog JSON listing color ids and images (default: colors.json)')
+    parser.add_argument('--output-dir', default=DEFAULT_OUTPUT_DIR,
+                        help=f'Directory for atlas images and atlas.json (default: {DEFAULT_OUTPUT_DIR})')
+    parser.add_argument('--sprite-height', type=int, default=DEFAULT_SPRITE_HEIGHT,
+                        help=f'Height of each sprite in pixels (default: {DEFAULT_SPRITE_HEIGHT})')
+    parser.add_argument('--atlas-size', type=int, default=DEFAULT_ATLAS_SIZE,
+                        help=f'Maximum atlas width and height in pixels (default: {DEFAULT_ATLAS_SIZE})')
+    parser.add_argument('--format', choices=['webp', 'jpg', 'png'], default='webp',
+                        help='Atlas image format (default: webp)')
+    args = parser.parse_args()
+
+    sprites = load_sprites(args.colors, args.sprite_height)
+    manifest = build_atlases(sprites, args.output_dir, args.atlas_size, args.format)
+
+    print(f"Packed {len(manifest['sprites'])} sprites into {len(manifest['atlases'])} atlas(es) in {args.output_dir}/")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Script to build WebP and JPEG thumbnails of every swatch image at a few widths.
+
+Thumbnails are written under thumbnails/, mirroring the source path, e.g.
+glaze_images/sc_16_cone06.jpg -> thumbnails/glaze_images/sc_16_cone06-150.webp.
+Only images whose thumbnails are missing or older than the source are
+rebuilt, and images are processed in parallel. The helpers here also produce
+the srcset/width/height markup used by the swatch pages and the thumbnail
+paths written to colors.json.
+"""
+
+import argparse
+import html
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image
+
+THUMBNAIL_DIR = 'thumbnails'
+THUMBNAIL_WIDTHS = (75, 150, 300)
+THUMBNAIL_FORMATS = {'webp': 'WEBP', 'jpg': 'JPEG'}
+DISPLAY_WIDTH = 150
+QUALITY = 82
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+
+def thumbnail_path(image_path, width, extension='webp'):
+    """Return the thumbnail path for a source image at one width and format."""
+    stem = os.path.splitext(os.path.normpath(image_path))[0]
+    return f"{THUMBNAIL_DIR}/{stem}-{width}.{extension}".replace(os.sep, '/')
+
+def thumbnail_paths(image_path):
+    """Return every thumbnail path built for a source image."""
+    return [
+        thumbnail_path(image_path, width, extension)
+        for width in THUMBNAIL_WIDTHS for extension in THUMBNAIL_FORMATS
+    ]
+
+def is_up_to_date(image_path):
+    """Return True if every thumbnail exists and is newer than the source image."""
+    source_mtime = os.path.getmtime(image_path)
+    for path in thumbnail_paths(image_path):
+        if not os.path.exists(path) or os.path.getmtime(path) < source_mtime:
+            return False
+    return True
+
+def build_thumbnails(image_path):
+    """Write all thumbnails for one image and return the number written."""
+    with Image.open(image_path) as image:
+        # Let libjpeg decode at the smallest scale that still covers the largest width
+        largest = max(THUMBNAIL_WIDTHS)
+        if image.width > largest:
+            image.draft('RGB', (largest, largest * image.height // image.width))
+        image = image.convert('RGB')
+
+        written = 0
+        for width in sorted(THUMBNAIL_WIDTHS, reverse=True):
+            height = max(1, round(image.height * width / image.width))
+            resized = image.resize((width, height), Image.LANCZOS)
+            for extension, image_format in THUMBNAIL_FORMATS.items():
+                path = thumbnail_path(image_path, width, extension)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                resized.save(path, image_format, quality=QUALITY)
+                written += 1
+        return written
+
+def find_images(folders):
+    """Return the image files in the given folders, sorted by path."""
+    images = []
+    for folder in folders:
+        if not os.path.isdir(folder):
+            continue
+        for filename in sorted(os.listdir(folder)):
+            if filename.lower().endswith(IMAGE_EXTENSIONS):
+                images.append(f"{folder}/{filename}")
+    return images
+
+def thumbnail_size(image_path, width=DISPLAY_WIDTH):
+    """Return the (width, height) of an image scaled to a thumbnail width, reading only its header."""
+    with Image.open(image_path) as image:
+        return width, max(1, round(image.height * width / image.width))
+
+def thumbnail_fields(image_path):
+    """Return the colors.json thumbnail fields for an image, or {} if no thumbnails were built."""
+    if not image_path or not os.path.exists(thumbnail_path(image_path, DISPLAY_WIDTH)):
+        return {}
+    return {
+        'thumbnail': thumbnail_path(image_path, DISPLAY_WIDTH),
+        'thumbnail_srcset': srcset(image_path, 'webp')
+    }
+
+def srcset(image_path, extension):
+    """Return a srcset attribute value listing every thumbnail width in one format."""
+    return ', '.join(f"{thumbnail_path(image_path, width, extension)} {width}w" for width in THUMBNAIL_WIDTHS)
+
+def image_markup(image_path, alt):
+    """Return responsive <picture> markup for a swatch image, or a plain lazy <img> without thumbnails."""
+    alt = html.escape(alt)
+
+    if not os.path.exists(thumbnail_path(image_path, DISPLAY_WIDTH, 'jpg')):
+        return f'<img src="{html.escape(image_path)}" alt="{alt}" loading="lazy" />'
+
+    width, height = thumbnail_size(image_path)
+    sizes = f"{DISPLAY_WIDTH}px"
+    return (
+        f'<picture>'
+        f'<source type="image/webp" srcset="{srcset(image_path, "webp")}" sizes="{sizes}" />'
+        f'<img src="{thumbnail_path(image_path, DISPLAY_WIDTH, "jpg")}" srcset="{srcset(image_path, "jpg")}" '
+        f'sizes="{sizes}" width="{width}" height="{height}" alt="{alt}" loading="lazy" />'
+        f'</picture>'
+    )
+
+def main():
+    """Main function to build thumbnails for changed swatch images."""
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('folders', nargs='*', default=['glaze_images', 'underglaze_images'],
+                        help='Image folders to process (default: glaze_images underglaze_images)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Number of worker processes (default: one per CPU core)')
+    parser.add_argument('--force', action='store_true',
+                        help='Rebuild thumbnails even if they are up to date')
+    args = parser.parse_args()
+
+    images = find_images(args.folders)
+    changed = [image_path for image_path in images if args.force or not is_up_to_date(image_path)]
+    print(f"Building thumbnails for {len(changed)} of {len(images)} images...")
+
+    with ProcessPoolExecutor(max_workers=max(1, args.workers)) as executor:
+        written = sum(executor.map(build_thumbnails, changed))
+
+    print(f"Wrote {written} thumbnails to {THUMBNAIL_DIR}/")
+
+if __name__ == "__main__":
+    main()
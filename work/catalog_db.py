@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+SQLite catalog store shared by the scrape, extract and JSON stages.
+
+Products, their images, the colors extracted from them and their brands
+live in one indexed database (catalog.db) instead of a chain of CSVs that
+every stage re-reads in full. Stages upsert the rows they own inside one
+transaction, so a re-run only touches what changed, and lookups by code,
+brand or cone use indexes. The CSVs (glazes_cone06.csv, glaze_colors.csv,
+...) are export views of the database, kept so the pipeline can fingerprint
+them and older tools can still read them.
+
+Usage:
+    python catalog_db.py --import-csv                 # load existing stage CSVs
+    python catalog_db.py --import-json ../colors.json # load other brands, e.g. Amaco
+    python catalog_db.py --lookup SC-16
+    python catalog_db.py --brand "Amaco Velvet Underglaze" --export amaco_colors.csv
+"""
+
+import argparse
+import csv
+import json
+import os
+import sqlite3
+
+from dominant_colors import format_dominant, parse_dominant
+
+DEFAULT_DB = 'catalog.db'
+SCHEMA_VERSION = 1
+DOWNLOAD_FAILED = 'DOWNLOAD_FAILED'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS brands (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS products (
+    id INTEGER PRIMARY KEY,
+    code TEXT NOT NULL,
+    cone TEXT NOT NULL DEFAULT '',
+    kind TEXT NOT NULL,
+    brand_id INTEGER NOT NULL REFERENCES brands (id),
+    name TEXT NOT NULL,
+    position INTEGER NOT NULL DEFAULT 0,
+    UNIQUE (code, cone)
+);
+CREATE INDEX IF NOT EXISTS products_brand ON products (brand_id, kind, position);
+CREATE INDEX IF NOT EXISTS products_cone ON products (cone, kind);
+CREATE TABLE IF NOT EXISTS images (
+    product_id INTEGER PRIMARY KEY REFERENCES products (id) ON DELETE CASCADE,
+    url TEXT,
+    path TEXT
+);
+CREATE TABLE IF NOT EXISTS samples (
+    product_id INTEGER PRIMARY KEY REFERENCES products (id) ON DELETE CASCADE,
+    left_hex TEXT NOT NULL,
+    top_hex TEXT NOT NULL,
+    left_rgb TEXT NOT NULL,
+    top_rgb TEXT NOT NULL,
+    dominant TEXT
+);
+CREATE TABLE IF NOT EXISTS retired_products (
+    code TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    retired_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (code, kind)
+);
+CREATE VIEW IF NOT EXISTS scraped_products AS
+    SELECT p.id AS product_id, p.kind, p.cone, p.brand_id, b.name AS brand, p.position,
+           p.code, p.name AS color_name, i.url AS image_url,
+           COALESCE(i.path, 'DOWNLOAD_FAILED') AS local_image_path
+    FROM products p JOIN brands b ON b.id = p.brand_id LEFT JOIN images i ON i.product_id = p.id;
+CREATE VIEW IF NOT EXISTS extracted_colors AS
+    SELECT p.id AS product_id, p.kind, p.cone, p.brand_id, b.name AS brand, p.position,
+           p.code, p.name AS color_name, s.left_hex AS left_color_hex, s.top_hex AS top_color_hex,
+           s.left_rgb AS left_color_rgb, s.top_rgb AS top_color_rgb, s.dominant AS dominant_colors,
+           i.path AS local_image_path
+    FROM samples s JOIN products p ON p.id = s.product_id JOIN brands b ON b.id = p.brand_id
+    LEFT JOIN images i ON i.product_id = p.id;
+"""
+
+# Catalog sections filled by the scrape and extract stages, with the CSVs they export
+SECTIONS = {
+    'glazes': {
+        'kind': 'glaze',
+        'brand': 'Mayco Fundamentals',
+        'cone': '06',
+        'products_csv': 'glazes_cone06.csv',
+        'colors_csv': 'glaze_colors.csv'
+    },
+    'underglazes': {
+        'kind': 'underglaze',
+        'brand': 'Mayco Stroke and Coat',
+        'cone': '06',
+        'products_csv': 'underglazes_cone06.csv',
+        'colors_csv': 'underglaze_colors.csv'
+    }
+}
+
+PRODUCT_FIELDS = ['code', 'color_name', 'image_url', 'local_image_path']
+COLOR_FIELDS = ['code', 'color_name', 'left_color_hex', 'top_color_hex', 'left_color_rgb', 'top_color_rgb']
+
+def connect(db_file=DEFAULT_DB):
+    """Open the catalog database, creating the schema if needed."""
+    conn = sqlite3.connect(db_file, timeout=30)
+    conn.row_factory = sqlite3.Row
+    # WAL lets the glaze and underglaze stages read while the other one writes
+    conn.execute('PRAGMA journal_mode = WAL')
+    conn.execute('PRAGMA synchronous = NORMAL')
+    conn.execute('PRAGMA foreign_keys = ON')
+    conn.executescript(SCHEMA)
+    conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+    return conn
+
+def add_db_argument(parser):
+    """Add the --db option shared by the catalog stages."""
+    parser.add_argument('--db', default=DEFAULT_DB, help=f'Catalog database (default: {DEFAULT_DB})')
+
+def brand_id(conn, name):
+    """Return the id of a brand, adding it if it is new."""
+    conn.execute('INSERT INTO brands (name) VALUES (?) ON CONFLICT (name) DO NOTHING', (name,))
+    return conn.execute('SELECT id FROM brands WHERE name = ?', (name,)).fetchone()[0]
+
+def upsert_products(conn, products, kind, brand, cone='', prune=False):
+    """Insert or update products and their images for one brand, kind and cone.
+
+    Each product is a dict with code, color_name and optionally image_url and
+    local_image_path (DOWNLOAD_FAILED or empty for no local image). Their order
+    is kept as the catalog order. With prune=True, products of this brand, kind
+    and cone that are not in the list are deleted along with their images and
+    samples, as when a product disappears from the catalog page, and their
+    codes are recorded in retired_products until they come back.
+    """
+    with conn:
+        brand = brand_id(conn, brand)
+        conn.executemany(
+            """INSERT INTO products (code, cone, kind, brand_id, name, position) VALUES (?, ?, ?, ?, ?, ?)
+               ON CONFLICT (code, cone) DO UPDATE SET
+                   kind = excluded.kind, brand_id = excluded.brand_id, name = excluded.name,
+                   position = excluded.position""",
+            [(product['code'], cone, kind, brand, product['color_name'], position)
+             for position, product in enumerate(products)]
+        )
+        conn.executemany(
+            """INSERT INTO images (product_id, url, path)
+               SELECT id, ?, ? FROM products WHERE code = ? AND cone = ?
+               ON CONFLICT (product_id) DO UPDATE SET
+                   url = COALESCE(excluded.url, images.url), path = excluded.path""",
+            [(product.get('image_url') or None, local_path(product.get('local_image_path')), product['code'], cone)
+             for product in products]
+        )
+        # Colors sampled from an image whose download now fails are stale
+        conn.executemany(
+            'DELETE FROM samples WHERE product_id = (SELECT id FROM products WHERE code = ? AND cone = ?)',
+            [(product['code'], cone) for product in products if product.get('local_image_path') == DOWNLOAD_FAILED]
+        )
+
+        conn.executemany('DELETE FROM retired_products WHERE code = ? AND kind = ?',
+                         [(product['code'], kind) for product in products])
+
+        if prune:
+            conn.execute(
+                """INSERT OR REPLACE INTO retired_products (code, kind)
+                   SELECT code, kind FROM products WHERE brand_id = ? AND kind = ? AND cone = ?
+                   AND code NOT IN (SELECT value FROM json_each(?))""",
+                (brand, kind, cone, json.dumps([product['code'] for product in products]))
+            )
+            conn.execute(
+                """DELETE FROM products WHERE brand_id = ? AND kind = ? AND cone = ?
+                   AND code NOT IN (SELECT value FROM json_each(?))""",
+                (brand, kind, cone, json.dumps([product['code'] for product in products]))
+            )
+
+def retired_codes(conn, kind):
+    """Return the codes of products of a kind that were pruned from the catalog and have not come back."""
+    return {row[0] for row in conn.execute('SELECT code FROM retired_products WHERE kind = ?', (kind,))}
+
+def local_path(path):
+    """Return a stored image path, or None for a failed or missing download."""
+    return path if path and path != DOWNLOAD_FAILED else None
+
+def rgb_text(rgb):
+    """Format an RGB tuple the way the color CSVs do, e.g. '(219, 220, 214)'."""
+    return f"({rgb[0]}, {rgb[1]}, {rgb[2]})"
+
+def hex_to_rgb(hex_color):
+    """Convert a '#rrggbb' string to an RGB tuple."""
+    return tuple(int(hex_color[i:i + 2], 16) for i in (1, 3, 5))
+
+def upsert_samples(conn, samples):
+    """Insert or update extracted colors by product id.
+
+    Each sample is a dict with product_id, left_color and top_color RGB
+    tuples and optionally a dominant colors list. Without dominant colors
+    (a run without --dominant) the stored ones are kept, unless the point
+    colors changed, which means the image did too. A sample whose colors
+    could not be extracted deletes any colors stored for that product.
+    """
+    extracted = [sample for sample in samples if sample['left_color'] and sample['top_color']]
+    failed = [sample for sample in samples if not (sample['left_color'] and sample['top_color'])]
+
+    with conn:
+        conn.executemany(
+            """INSERT INTO samples (product_id, left_hex, top_hex, left_rgb, top_rgb, dominant)
+               VALUES (?, ?, ?, ?, ?, ?)
+               ON CONFLICT (product_id) DO UPDATE SET
+                   left_hex = excluded.left_hex, top_hex = excluded.top_hex, left_rgb = excluded.left_rgb,
+                   top_rgb = excluded.top_rgb,
+                   dominant = COALESCE(excluded.dominant, CASE
+                       WHEN samples.left_hex = excluded.left_hex AND samples.top_hex = excluded.top_hex
+                       THEN samples.dominant END)""",
+            [(sample['product_id'],
+              '#{:02x}{:02x}{:02x}'.format(*sample['left_color']),
+              '#{:02x}{:02x}{:02x}'.format(*sample['top_color']),
+              rgb_text(sample['left_color']),
+              rgb_text(sample['top_color']),
+              format_dominant(sample['dominant']) if sample.get('dominant') else None)
+             for sample in extracted]
+        )
+        conn.executemany('DELETE FROM samples WHERE product_id = ?', [(sample['product_id'],) for sample in failed])
+
+def section_filter(section):
+    """Return the WHERE clause and parameters selecting one catalog section."""
+    return 'kind = ? AND brand = ? AND cone = ?', (section['kind'], section['brand'], section['cone'])
+
+def section_products(conn, section, downloaded=True):
+    """Return a section's products in catalog order, by default only those with a local image."""
+    where, params = section_filter(section)
+    if downloaded:
+        where += " AND local_image_path != 'DOWNLOAD_FAILED'"
+    return conn.execute(f'SELECT * FROM scraped_products WHERE {where} ORDER BY position', params).fetchall()
+
+def catalog_colors(conn, kind):
+    """Return the extracted colors of every product of a kind, grouped by brand in catalog order."""
+    return conn.execute(
+        'SELECT * FROM extracted_colors WHERE kind = ? ORDER BY brand_id, position', (kind,)
+    ).fetchall()
+
+def lookup(conn, code):
+    """Return every product with a code (one per cone), with its brand, image and colors."""
+    return conn.execute(
+        """SELECT sp.*, ec.left_color_hex, ec.top_color_hex, ec.dominant_colors
+           FROM scraped_products sp LEFT JOIN extracted_colors ec ON ec.product_id = sp.product_id
+           WHERE sp.code = ? ORDER BY sp.cone""",
+        (code,)
+    ).fetchall()
+
+def export_csv(conn, view, csv_file, fieldnames, where='1', params=()):
+    """Write rows of a view to a CSV in catalog order and return the number of rows."""
+    rows = conn.execute(
+        f"SELECT {', '.join(fieldnames)} FROM {view} WHERE {where} ORDER BY brand_id, position", params
+    )
+    with open(csv_file, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(fieldnames)
+        written = 0
+        for row in rows:
+            writer.writerow(['' if value is None else value for value in row])
+            written += 1
+    return written
+
+def export_products_csv(conn, section, csv_file=None):
+    """Export a section's scraped products as its scraper CSV (e.g. glazes_cone06.csv)."""
+    where, params = section_filter(section)
+    return export_csv(conn, 'scraped_products', csv_file or section['products_csv'], PRODUCT_FIELDS, where, params)
+
+def export_colors_csv(conn, section, csv_file=None, dominant=False):
+    """Export a section's extracted colors as its colors CSV (e.g. glaze_colors.csv)."""
+    where, params = section_filter(section)
+    fieldnames = COLOR_FIELDS + ['dominant_colors'] if dominant else COLOR_FIELDS
+    return export_csv(conn, 'extracted_colors', csv_file or section['colors_csv'], fieldnames, where, params)
+
+def read_csv(csv_file):
+    """Read the rows of a CSV file, or [] if it does not exist."""
+    if not os.path.exists(csv_file):
+        return []
+    with open(csv_file, 'r', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+def import_section_csvs(conn, section):
+    """Load a section's scraper and colors CSVs into the database; return (products, samples)."""
+    products = read_csv(section['products_csv'])
+    colors = read_csv(section['colors_csv'])
+
+    if products:
+        upsert_products(conn, products, section['kind'], section['brand'], section['cone'])
+    elif colors:
+        # Colors without a scraper CSV still need products to hang from
+        upsert_products(conn, colors, section['kind'], section['brand'], section['cone'])
+
+    ids = {row['code']: row['product_id'] for row in section_products(conn, section, downloaded=False)}
+    upsert_samples(conn, [
+        {
+            'product_id': ids[row['code']],
+            'left_color': hex_to_rgb(row['left_color_hex']),
+            'top_color': hex_to_rgb(row['top_color_hex']),
+            'dominant': [(hex_to_rgb(color['color']), color['share'])
+                         for color in parse_dominant(row.get('dominant_colors'))]
+        }
+        for row in colors if row['code'] in ids and row['left_color_hex'] and row['top_color_hex']
+    ])
+    return len(products), len(colors)
+
+def ensure_section(conn, section):
+    """Import a section from its CSVs if the database has none of its products yet.
+
+    Lets trees built before the database existed keep working when the
+    pipeline skips their up-to-date scrape stages.
+    """
+    if not section_products(conn, section, downloaded=False):
+        import_section_csvs(conn, section)
+
+def import_colors_json(conn, colors_file):
+    """Load every brand in a colors.json (e.g. the Amaco entries) into the database; return the count."""
+    with open(colors_file, 'r', encoding='utf-8') as f:
+        colors_data = json.load(f)
+
+    cones = {(section['kind'], section['brand']): section['cone'] for section in SECTIONS.values()}
+    imported = 0
+    for key, kind in (('glazes', 'glaze'), ('underglazes', 'underglaze')):
+        by_brand = {}
+        for entry in colors_data.get(key, []):
+            by_brand.setdefault(entry.get('brand', ''), []).append(entry)
+
+        for brand, entries in by_brand.items():
+            cone = cones.get((kind, brand), '')
+            upsert_products(conn, [
+                {'code': entry['id'], 'color_name': entry['name'], 'local_image_path': entry.get('image')}
+                for entry in entries
+            ], kind, brand, cone)
+
+            ids = {row['code']: row['product_id'] for row in conn.execute(
+                'SELECT id AS product_id, code FROM products WHERE cone = ? AND code IN (SELECT value FROM json_each(?))',
+                (cone, json.dumps([entry['id'] for entry in entries]))
+            )}
+            upsert_samples(conn, [
+                {
+                    'product_id': ids[entry['id']],
+                    'left_color': hex_to_rgb(entry.get('left', entry.get('color'))),
+                    'top_color': hex_to_rgb(entry.get('top', entry.get('color'))),
+                    'dominant': [(hex_to_rgb(color['color']), color['share']) for color in entry.get('dominant', [])]
+                }
+                for entry in entries
+            ])
+            imported += len(entries)
+
+    return imported
+
+def main():
+    """Main function to import, look up and export catalog data."""
+    parser = argparse.ArgumentParser(description=__doc__.strip(), formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_db_argument(parser)
+    parser.add_argument('--import-csv', action='store_true',
+                        help='Load the scraper and colors CSVs of every section into the database')
+    parser.add_argument('--import-json', metavar='FILE', help='Load every product and color in a colors.json')
+    parser.add_argument('--lookup', metavar='CODE', help='Print a product by code')
+    parser.add_argument('--export', metavar='CSV', help='Export extracted colors, optionally for one brand')
+    parser.add_argument('--brand', help='Brand to export (default: all)')
+    args = parser.parse_args()
+
+    conn = connect(args.db)
+    with conn:
+        if args.import_csv:
+            for name, section in SECTIONS.items():
+                products, colors = import_section_csvs(conn, section)
+                print(f"Imported {name}: {products} products, {colors} colors")
+
+        if args.import_json:
+            print(f"Imported {import_colors_json(conn, args.import_json)} colors from {args.import_json}")
+
+        if args.lookup:
+            rows = lookup(conn, args.lookup)
+            if not rows:
+                print(f"No product with code {args.lookup}")
+            for row in rows:
+                print(json.dumps(dict(row), ensure_ascii=False))
+
+        if args.export:
+            where, params = ('brand = ?', (args.brand,)) if args.brand else ('1', ())
+            written = export_csv(conn, 'extracted_colors', args.export, COLOR_FIELDS + ['brand', 'local_image_path'],
+                                 where, params)
+            print(f"Exported {written} colors to {args.export}")
+
+        counts = conn.execute(
+            'SELECT b.name, p.kind, COUNT(*) FROM products p JOIN brands b ON b.id = p.brand_id '
+            'GROUP BY b.name, p.kind ORDER BY b.id'
+        ).fetchall()
+        for brand, kind, total in counts:
+            print(f"{brand} ({kind}): {total} products")
+    conn.close()
+
+if __name__ == "__main__":
+    main()
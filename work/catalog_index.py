@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Script to index saved catalog pages by product line, code prefix and cone in one pass.
+
+Each page is parsed once with catalog_parser and every product is kept, so
+Cone 06, 6 and 10 data for glazes and underglazes all come from the same
+parse. The index is written as one normalized CSV table and, optionally, as
+one CSV per code prefix and cone.
+"""
+
+import argparse
+import csv
+import os
+
+from catalog_parser import parse_products
+
+# Product lines by code prefix
+PRODUCT_LINES = {
+    'SC': 'Stroke & Coat',
+    'UG': 'Underglaze'
+}
+
+TABLE_FIELDS = ['code', 'color_name', 'prefix', 'line', 'cone', 'image_url', 'source']
+CONE_FIELDS = ['code', 'color_name', 'image_url']
+
+def code_prefix(code):
+    """Return the prefix of a product code, e.g. 'SC' for 'SC-16'."""
+    return code.split('-', 1)[0].upper() if code and '-' in code else None
+
+def build_index(html_files):
+    """Parse each catalog page once and index its products by (prefix, cone)."""
+    products = []
+    by_key = {}
+
+    for html_file in html_files:
+        for product in parse_products(html_file):
+            prefix = code_prefix(product['code'])
+            if not prefix or not product['color_name'] or not product['cone']:
+                continue
+
+            product = dict(product, prefix=prefix, line=PRODUCT_LINES.get(prefix, prefix),
+                           source=os.path.basename(html_file))
+            products.append(product)
+            by_key.setdefault((prefix, product['cone']), []).append(product)
+
+    return {'products': products, 'by_key': by_key}
+
+def lookup(index, prefix=None, cone=None):
+    """Return indexed products matching a code prefix and/or cone, in page order."""
+    if prefix and cone:
+        return index['by_key'].get((prefix.upper(), cone), [])
+    return [
+        product for product in index['products']
+        if (not prefix or product['prefix'] == prefix.upper()) and (not cone or product['cone'] == cone)
+    ]
+
+def write_table(index, csv_file):
+    """Write every indexed product to one normalized CSV table."""
+    with open(csv_file, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=TABLE_FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(index['products'])
+
+def write_cone_csvs(index, output_dir):
+    """Write one CSV per code prefix and cone, e.g. sc_cone06.csv, and return their paths."""
+    os.makedirs(output_dir, exist_ok=True)
+
+    paths = []
+    for (prefix, cone), products in sorted(index['by_key'].items()):
+        path = os.path.join(output_dir, f"{prefix.lower()}_cone{cone}.csv")
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=CONE_FIELDS, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(products)
+        paths.append(path)
+
+    return paths
+
+def main():
+    """Main function to index catalog pages and write the CSV outputs."""
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('html_files', nargs='*', default=['glazes.html', 'underglazes.html'],
+                        help='Saved catalog pages (default: glazes.html underglazes.html)')
+    parser.add_argument('--table', default='catalog_index.csv',
+                        help='Normalized CSV table of every product (default: catalog_index.csv)')
+    parser.add_argument('--split-dir',
+                        help='Also write one CSV per code prefix and cone into this directory')
+    args = parser.parse_args()
+
+    index = build_index(args.html_files)
+
+    write_table(index, args.table)
+    print(f"Indexed {len(index['products'])} products: {args.table}")
+
+    if args.split_dir:
+        for path in write_cone_csvs(index, args.split_dir):
+            print(f"CSV file created: {path}")
+
+    for (prefix, cone), products in sorted(index['by_key'].items()):
+        print(f"  {PRODUCT_LINES.get(prefix, prefix)} ({prefix}) Cone {cone}: {len(products)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Script to export colors.json as a compact columnar binary catalog plus minified and precompressed JSON.
+
+The binary layout keeps each column contiguous so a reader can memory-map
+the file and decode only the records it touches:
+
+    header   magic b'CCAT', version u16, field count u16,
+             record count u32, string count u32 (little-endian)
+    kinds    record count x u8 (0 = glaze, 1 = underglaze), padded to 4 bytes
+    colors   record count x 6 u8: primary RGB (color / left) then top RGB,
+             padded to 4 bytes
+    refs     record count x field count x u32 indexes into the string
+             table, NO_STRING when a field is missing
+    offsets  (string count + 1) x u32 byte offsets into the string data
+    strings  UTF-8 string data, each distinct string stored once
+
+Alongside it the catalog is written as minified JSON with .gz and, when the
+brotli package is installed, .br variants for static serving.
+"""
+
+import argparse
+import gzip
+import json
+import mmap
+import os
+import struct
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MAGIC = b'CCAT'
+VERSION = 1
+HEADER = struct.Struct('<4sHHII')
+STRING_FIELDS = ('id', 'name', 'brand', 'image', 'thumbnail', 'thumbnail_srcset')
+KINDS = ('glaze', 'underglaze')
+NO_STRING = 0xFFFFFFFF
+
+def hex_to_bytes(hex_color):
+    """Convert '#rrggbb' to 3 bytes."""
+    return bytes.fromhex(hex_color.lstrip('#'))
+
+def bytes_to_hex(data):
+    """Convert 3 bytes to '#rrggbb'."""
+    return f"#{data.hex()}"
+
+def pad4(data):
+    """Pad bytes with zeros to a multiple of 4."""
+    return data + b'\0' * (-len(data) % 4)
+
+def catalog_records(colors_data):
+    """Return (kind, color dict) pairs for every glaze and underglaze."""
+    return ([(0, glaze) for glaze in colors_data.get('glazes', [])]
+            + [(1, underglaze) for underglaze in colors_data.get('underglazes', [])])
+
+def pack_catalog(colors_data):
+    """Pack a colors.json structure into the columnar binary format."""
+    records = catalog_records(colors_data)
+    strings = {}
+
+    def intern(value):
+        if value is None:
+            return NO_STRING
+        return strings.setdefault(value, len(strings))
+
+    kinds = bytearray()
+    colors = bytearray()
+    refs = []
+    for kind, color in records:
+        kinds.append(kind)
+        if kind == 0:
+            colors += hex_to_bytes(color['color']) * 2
+        else:
+            colors += hex_to_bytes(color['left']) + hex_to_bytes(color['top'])
+        refs.extend(intern(color.get(field)) for field in STRING_FIELDS)
+
+    encoded = [value.encode('utf-8') for value in strings]
+    offsets = [0]
+    for value in encoded:
+        offsets.append(offsets[-1] + len(value))
+
+    return b''.join([
+        HEADER.pack(MAGIC, VERSION, len(STRING_FIELDS), len(records), len(strings)),
+        pad4(bytes(kinds)),
+        pad4(bytes(colors)),
+        struct.pack(f'<{len(refs)}I', *refs),
+        struct.pack(f'<{len(offsets)}I', *offsets),
+        b''.join(encoded)
+    ])
+
+class CatalogReader:
+    """Memory-mapped reader that decodes catalog records on demand.
+
+    Use as a context manager:
+
+        with CatalogReader('colors.bin') as catalog:
+            glaze = catalog.find('SC-16')
+    """
+
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.field_count, self.count, self.string_count = HEADER.unpack_from(self.data)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a version {VERSION} binary catalog")
+
+        self.kinds_offset = HEADER.size
+        self.colors_offset = self.kinds_offset + self.count + (-self.count % 4)
+        self.refs_offset = self.colors_offset + 6 * self.count + (-6 * self.count % 4)
+        self.string_offsets = self.refs_offset + 4 * self.count * self.field_count
+        self.strings_offset = self.string_offsets + 4 * (self.string_count + 1)
+        self.fields = STRING_FIELDS[:self.field_count]
+        self._strings = {}
+        self._ids = None
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        return (self[i] for i in range(self.count))
+
+    def string(self, index):
+        """Return one string from the string table, decoding it at most once."""
+        if index == NO_STRING:
+            return None
+        if index not in self._strings:
+            start, end = struct.unpack_from('<2I', self.data, self.string_offsets + 4 * index)
+            offset = self.strings_offset
+            self._strings[index] = self.data[offset + start:offset + end].decode('utf-8')
+        return self._strings[index]
+
+    def __getitem__(self, i):
+        """Decode record i into the same dict shape as its colors.json entry."""
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+
+        kind = KINDS[self.data[self.kinds_offset + i]]
+        colors = self.data[self.colors_offset + 6 * i:self.colors_offset + 6 * i + 6]
+        refs = struct.unpack_from(f'<{self.field_count}I', self.data, self.refs_offset + 4 * self.field_count * i)
+
+        record = {'kind': kind}
+        for field, ref in zip(self.fields, refs):
+            if ref != NO_STRING:
+                record[field] = self.string(ref)
+        if kind == 'glaze':
+            record['color'] = bytes_to_hex(colors[:3])
+        else:
+            record['left'] = bytes_to_hex(colors[:3])
+            record['top'] = bytes_to_hex(colors[3:])
+        return record
+
+    def find(self, color_id):
+        """Return the record with the given id, or None."""
+        if self._ids is None:
+            id_field = self.fields.index('id')
+            refs_size = 4 * self.field_count
+            self._ids = {
+                self.string(struct.unpack_from('<I', self.data, self.refs_offset + refs_size * i + 4 * id_field)[0]): i
+                for i in range(self.count)
+            }
+        i = self._ids.get(color_id)
+        return None if i is None else self[i]
+
+    def close(self):
+        """Unmap and close the file."""
+        if self.data is not None:
+            self.data.close()
+            self.data = None
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+def write_json_variants(colors_data, output_file):
+    """Write minified JSON with gzip and, if available, brotli variants; return the paths written."""
+    payload = json.dumps(colors_data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    outputs = {output_file: payload, f"{output_file}.gz": gzip.compress(payload, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        outputs[f"{output_file}.br"] = brotli.compress(payload, quality=11)
+    else:
+        print("brotli not installed, skipping .br output")
+
+    for path, data in outputs.items():
+        with open(path, 'wb') as f:
+            f.write(data)
+    return list(outputs)
+
+def main():
+    """Main function to export the binary catalog and minified JSON variants."""
+    parser = argparse.ArgumentParser(description=__doc__.strip(), formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--colors', default='colors.json', help='Catalog JSON (default: colors.json)')
+    parser.add_argument('--output', default='colors.bin', help='Binary catalog to write (default: colors.bin)')
+    parser.add_argument('--json-output', default='colors.min.json',
+                        help='Minified JSON to write, with .gz/.br variants (default: colors.min.json)')
+    args = parser.parse_args()
+
+    with open(args.colors, 'r', encoding='utf-8') as f:
+        colors_data = json.load(f)
+
+    with open(args.output, 'wb') as f:
+        f.write(pack_catalog(colors_data))
+
+    print(f"{args.colors}: {os.path.getsize(args.colors)} bytes")
+    for path in [args.output] + write_json_variants(colors_data, args.json_output):
+        print(f"{path}: {os.path.getsize(path)} bytes")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Fast parser for saved Mayco catalog pages.
+
+Only the div.mayco-product nodes are examined. With lxml installed the page
+is read with an incremental iterparse that clears every element outside a
+product as soon as it ends, so memory stays small on multi-megabyte pages.
+Without lxml it falls back to BeautifulSoup restricted by a SoupStrainer.
+Code, name, cone and image URL are read from the element structure:
+
+    <div class="mayco-product"><a>
+        <img src="..." class="product-featured-image"> <br>
+        SC-16 <br>
+        Cotton Tail <br>
+        <small><em>(Cone 06)</em></small>
+    </a></div>
+"""
+
+import os
+import re
+
+from metrics import count, timer
+
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+PRODUCT_CLASS = 'mayco-product'
+IMAGE_CLASS = 'product-featured-image'
+
+CONE_PATTERN = re.compile(r'Cone\s+(\d+)', re.IGNORECASE)
+
+def parse_cone(text):
+    """Return the cone number from text like '(Cone 06)', or None."""
+    match = CONE_PATTERN.search(text or '')
+    return match.group(1) if match else None
+
+def make_product(fragments, cone_text, image_url):
+    """Build a product dict from the text fragments that follow each <br>."""
+    return {
+        'code': fragments[0] if len(fragments) > 0 else None,
+        'color_name': fragments[1] if len(fragments) > 1 else None,
+        'cone': parse_cone(cone_text),
+        'image_url': image_url
+    }
+
+def has_class(class_attr, name):
+    """Return True if a class attribute value contains the given class name."""
+    return name in (class_attr or '').split()
+
+def _product_from_element(div):
+    """Extract a product from an lxml mayco-product element."""
+    image_url = None
+    for img in div.iter('img'):
+        if has_class(img.get('class'), IMAGE_CLASS):
+            image_url = img.get('src')
+            break
+
+    fragments = [br.tail.strip() for br in div.iter('br') if br.tail and br.tail.strip()]
+
+    small = next(div.iter('small'), None)
+    cone_text = ''.join(small.itertext()) if small is not None else ''
+
+    return make_product(fragments, cone_text, image_url)
+
+def _parse_products_lxml(html_file):
+    """Parse products with lxml's incremental HTML parser."""
+    products = []
+    depth = 0
+
+    for event, elem in etree.iterparse(html_file, events=('start', 'end'), html=True, encoding='utf-8'):
+        is_product = elem.tag == 'div' and has_class(elem.get('class'), PRODUCT_CLASS)
+
+        if event == 'start':
+            if is_product:
+                depth += 1
+            continue
+
+        if is_product:
+            depth -= 1
+            products.append(_product_from_element(elem))
+
+        # Free everything outside a product as soon as it has been seen
+        if not depth:
+            elem.clear(keep_tail=True)
+            parent = elem.getparent()
+            while parent is not None and elem.getprevious() is not None:
+                del parent[0]
+
+    return products
+
+def _parse_products_soup(html_file):
+    """Parse products with BeautifulSoup, building only the product subtrees."""
+    from bs4 import BeautifulSoup, NavigableString, SoupStrainer
+
+    with open(html_file, 'r', encoding='utf-8') as f:
+        content = f.read()
+
+    only_products = SoupStrainer('div', class_=PRODUCT_CLASS)
+    soup = BeautifulSoup(content, 'html.parser', parse_only=only_products)
+
+    products = []
+    for div in soup.find_all('div', class_=PRODUCT_CLASS):
+        img_tag = div.find('img', class_=IMAGE_CLASS)
+        image_url = img_tag.get('src') if img_tag else None
+
+        fragments = []
+        for br in div.find_all('br'):
+            text = br.next_sibling
+            if isinstance(text, NavigableString) and text.strip():
+                fragments.append(text.strip())
+
+        small = div.find('small')
+        cone_text = small.get_text() if small else ''
+
+        products.append(make_product(fragments, cone_text, image_url))
+
+    return products
+
+def parse_products(html_file):
+    """Return every product on a saved catalog page as dicts of code, color_name, cone and image_url."""
+    with timer('parse'):
+        if etree is not None:
+            products = _parse_products_lxml(html_file)
+        else:
+            products = _parse_products_soup(html_file)
+    count('parse', 'bytes', os.path.getsize(html_file))
+    count('parse', 'products', len(products))
+    return products
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Script to report how far colors drift when images are decoded at reduced resolution.
+
+Compares extract_colors_from_image at each decode scale against full-resolution
+extraction and prints per-channel drift, how many published hex values change,
+and the decode time, so a --decode-scale can be picked that does not change
+the colors we publish.
+"""
+
+import argparse
+import csv
+import time
+
+from color_sampling import DECODE_SCALES, extract_colors_from_image
+
+def read_image_paths(csv_files):
+    """Read local image paths from scraper CSV files, skipping failed downloads."""
+    image_paths = []
+    for csv_file in csv_files:
+        with open(csv_file, 'r', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                if row['local_image_path'] and row['local_image_path'] != 'DOWNLOAD_FAILED':
+                    image_paths.append(row['local_image_path'])
+    return image_paths
+
+def extract_all(image_paths, decode_scale):
+    """Extract colors for every image at one decode scale, returning results and elapsed seconds."""
+    start = time.perf_counter()
+    results = [extract_colors_from_image(image_path, decode_scale=decode_scale) for image_path in image_paths]
+    return results, time.perf_counter() - start
+
+def compare_results(reference, results):
+    """Return drift statistics between full-resolution and reduced-resolution colors."""
+    max_drift = 0
+    total_drift = 0
+    channels = 0
+    changed = 0
+
+    for (ref_left, ref_top), (left, top) in zip(reference, results):
+        if not (ref_left and ref_top and left and top):
+            continue
+        for ref_color, color in ((ref_left, left), (ref_top, top)):
+            drifts = [abs(a - b) for a, b in zip(ref_color, color)]
+            max_drift = max(max_drift, max(drifts))
+            total_drift += sum(drifts)
+            channels += len(drifts)
+            if tuple(ref_color) != tuple(color):
+                changed += 1
+
+    return {
+        'max_drift': max_drift,
+        'mean_drift': total_drift / channels if channels else 0.0,
+        'changed_colors': changed,
+        'total_colors': channels // 3
+    }
+
+def main():
+    """Main function to report color drift for each decode scale."""
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('csv_files', nargs='*', default=['glazes_cone06.csv', 'underglazes_cone06.csv'],
+                        help='Scraper CSV files listing local_image_path (default: glaze and underglaze CSVs)')
+    parser.add_argument('--scales', type=int, nargs='+', choices=DECODE_SCALES, default=list(DECODE_SCALES[1:]),
+                        help='Decode scales to compare against full resolution')
+    args = parser.parse_args()
+
+    image_paths = read_image_paths(args.csv_files)
+    print(f"Comparing {len(image_paths)} images against full-resolution extraction...")
+
+    reference, reference_time = extract_all(image_paths, 1)
+    print(f"1/1: {reference_time:.2f}s")
+
+    for decode_scale in args.scales:
+        results, elapsed = extract_all(image_paths, decode_scale)
+        stats = compare_results(reference, results)
+        speedup = reference_time / elapsed if elapsed else float('inf')
+        print(f"1/{decode_scale}: {elapsed:.2f}s ({speedup:.1f}x faster), "
+              f"max drift {stats['max_drift']}, mean drift {stats['mean_drift']:.2f}, "
+              f"{stats['changed_colors']}/{stats['total_colors']} hex values changed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Perceptual nearest-color index over the glaze and underglaze catalog.
+
+Catalog colors are converted from sRGB to CIELAB in one vectorized pass and
+stored in a KD-tree, so k-nearest and radius queries by CIE76 Delta E (plain
+Euclidean distance in Lab) cost a tree lookup instead of a scan. Results
+can optionally be re-ranked by CIEDE2000. Uses scipy's cKDTree when
+available and falls back to vectorized brute force, which is still
+sub-millisecond for a catalog of a few thousand colors and works through
+large query batches (such as a LUT's cells) in chunks of QUERY_CHUNK colors
+so memory stays bounded.
+
+Usage:
+    python color_index.py "#c0392b" -k 5 --de2000
+"""
+
+import argparse
+import json
+
+import numpy as np
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:
+    cKDTree = None
+
+# Query colors per brute-force distance matrix (QUERY_CHUNK x catalog size)
+QUERY_CHUNK = 4096
+
+# D65 reference white
+WHITE_POINT = np.array([0.95047, 1.0, 1.08883])
+
+SRGB_TO_XYZ = np.array([
+    [0.4124564, 0.3575761, 0.1804375],
+    [0.2126729, 0.7151522, 0.0721750],
+    [0.0193339, 0.1191920, 0.9503041]
+])
+
+def hex_to_rgb_array(hex_colors):
+    """Convert '#rrggbb' strings to an (N, 3) uint8 array."""
+    return np.array([
+        [int(value.lstrip('#')[i:i + 2], 16) for i in (0, 2, 4)]
+        for value in hex_colors
+    ], dtype=np.uint8).reshape(-1, 3)
+
+def srgb_to_lab(rgb):
+    """Convert an (..., 3) array of sRGB values in 0-255 to CIELAB (D65)."""
+    rgb = np.asarray(rgb, dtype=np.float64) / 255.0
+    linear = np.where(rgb <= 0.04045, rgb / 12.92, ((rgb + 0.055) / 1.055) ** 2.4)
+
+    xyz = linear @ SRGB_TO_XYZ.T / WHITE_POINT
+    f = np.where(xyz > (6 / 29) ** 3, np.cbrt(xyz), xyz / (3 * (6 / 29) ** 2) + 4 / 29)
+
+    lab = np.empty_like(f)
+    lab[..., 0] = 116 * f[..., 1] - 16
+    lab[..., 1] = 500 * (f[..., 0] - f[..., 1])
+    lab[..., 2] = 200 * (f[..., 1] - f[..., 2])
+    return lab
+
+def delta_e_2000(lab1, lab2):
+    """Return CIEDE2000 color differences between broadcastable (..., 3) Lab arrays."""
+    lab1 = np.asarray(lab1, dtype=np.float64)
+    lab2 = np.asarray(lab2, dtype=np.float64)
+    L1, a1, b1 = lab1[..., 0], lab1[..., 1], lab1[..., 2]
+    L2, a2, b2 = lab2[..., 0], lab2[..., 1], lab2[..., 2]
+
+    C_bar = (np.hypot(a1, b1) + np.hypot(a2, b2)) / 2
+    G = 0.5 * (1 - np.sqrt(C_bar ** 7 / (C_bar ** 7 + 25.0 ** 7)))
+    a1p, a2p = (1 + G) * a1, (1 + G) * a2
+    C1p, C2p = np.hypot(a1p, b1), np.hypot(a2p, b2)
+    h1p = np.degrees(np.arctan2(b1, a1p)) % 360
+    h2p = np.degrees(np.arctan2(b2, a2p)) % 360
+
+    dLp = L2 - L1
+    dCp = C2p - C1p
+    dhp = h2p - h1p
+    dhp = np.where(dhp > 180, dhp - 360, np.where(dhp < -180, dhp + 360, dhp))
+    dhp = np.where(C1p * C2p == 0, 0, dhp)
+    dHp = 2 * np.sqrt(C1p * C2p) * np.sin(np.radians(dhp / 2))
+
+    Lp_bar = (L1 + L2) / 2
+    Cp_bar = (C1p + C2p) / 2
+    hp_sum = h1p + h2p
+    hp_bar = np.where(
+        C1p * C2p == 0, hp_sum,
+        np.where(np.abs(h1p - h2p) <= 180, hp_sum / 2,
+                 np.where(hp_sum < 360, (hp_sum + 360) / 2, (hp_sum - 360) / 2))
+    )
+
+    T = (1 - 0.17 * np.cos(np.radians(hp_bar - 30)) + 0.24 * np.cos(np.radians(2 * hp_bar))
+         + 0.32 * np.cos(np.radians(3 * hp_bar + 6)) - 0.20 * np.cos(np.radians(4 * hp_bar - 63)))
+    d_theta = 30 * np.exp(-(((hp_bar - 275) / 25) ** 2))
+    R_C = 2 * np.sqrt(Cp_bar ** 7 / (Cp_bar ** 7 + 25.0 ** 7))
+    S_L = 1 + 0.015 * (Lp_bar - 50) ** 2 / np.sqrt(20 + (Lp_bar - 50) ** 2)
+    S_C = 1 + 0.045 * Cp_bar
+    S_H = 1 + 0.015 * Cp_bar * T
+    R_T = -np.sin(np.radians(2 * d_theta)) * R_C
+
+    return np.sqrt(
+        (dLp / S_L) ** 2 + (dCp / S_C) ** 2 + (dHp / S_H) ** 2
+        + R_T * (dCp / S_C) * (dHp / S_H)
+    )
+
+def load_catalog(colors_file='colors.json'):
+    """Load catalog entries from colors.json as dicts with id, name, kind and hex color."""
+    with open(colors_file, 'r', encoding='utf-8') as f:
+        colors_data = json.load(f)
+
+    entries = []
+    for glaze in colors_data.get('glazes', []):
+        entries.append({'id': glaze['id'], 'name': glaze['name'], 'kind': 'glaze', 'color': glaze['color']})
+    for underglaze in colors_data.get('underglazes', []):
+        entries.append({'id': underglaze['id'], 'name': underglaze['name'], 'kind': 'underglaze',
+                        'color': underglaze['left']})
+    return entries
+
+class ColorIndex:
+    """Nearest-color lookups over catalog entries in CIELAB space."""
+
+    def __init__(self, entries):
+        self.entries = list(entries)
+        self.lab = srgb_to_lab(hex_to_rgb_array([entry['color'] for entry in self.entries]))
+        self.tree = cKDTree(self.lab) if cKDTree is not None and len(self.entries) else None
+
+    @classmethod
+    def from_json(cls, colors_file='colors.json'):
+        """Build an index from a colors.json file."""
+        return cls(load_catalog(colors_file))
+
+    def _query_lab(self, lab, k):
+        """Return (distances, indices) of shape (N, k) by CIE76 for (N, 3) Lab queries."""
+        k = min(k, len(self.entries))
+        if self.tree is not None:
+            distances, indices = self.tree.query(lab, k=k)
+            return distances.reshape(len(lab), k), indices.reshape(len(lab), k)
+
+        nearest_distances = np.empty((len(lab), k))
+        nearest_indices = np.empty((len(lab), k), dtype=np.int64)
+        for start in range(0, len(lab), QUERY_CHUNK):
+            chunk = slice(start, start + QUERY_CHUNK)
+            distances = np.linalg.norm(lab[chunk, None, :] - self.lab[None, :, :], axis=2)
+            indices = np.argsort(distances, axis=1)[:, :k]
+            nearest_distances[chunk] = np.take_along_axis(distances, indices, axis=1)
+            nearest_indices[chunk] = indices
+        return nearest_distances, nearest_indices
+
+    def nearest_indices(self, rgb, de2000=False):
+        """Return the index of the nearest entry for each color in an (N, 3) sRGB array."""
+        lab = srgb_to_lab(np.asarray(rgb, dtype=np.float64).reshape(-1, 3))
+        if not de2000:
+            return self._query_lab(lab, 1)[1][:, 0]
+
+        _, indices = self._query_lab(lab, 4)
+        distances = delta_e_2000(lab[:, None, :], self.lab[indices])
+        return np.take_along_axis(indices, np.argmin(distances, axis=1)[:, None], axis=1)[:, 0]
+
+    def nearest_batch(self, rgb, k=1, de2000=False, candidates=None):
+        """Return the k nearest entries for each color in an (N, 3) sRGB array.
+
+        Each result is a list of (entry, delta_e) pairs. With de2000=True the
+        closest candidates (default 4 * k) by CIE76 are re-ranked by CIEDE2000
+        and the reported distance is the CIEDE2000 value.
+        """
+        lab = srgb_to_lab(np.asarray(rgb, dtype=np.float64).reshape(-1, 3))
+        fetch = max(k, candidates or 4 * k) if de2000 else k
+        distances, indices = self._query_lab(lab, fetch)
+
+        if de2000:
+            distances = delta_e_2000(lab[:, None, :], self.lab[indices])
+            order = np.argsort(distances, axis=1)
+            distances = np.take_along_axis(distances, order, axis=1)
+            indices = np.take_along_axis(indices, order, axis=1)
+
+        return [
+            [(self.entries[i], float(d)) for i, d in zip(row_indices[:k], row_distances[:k])]
+            for row_indices, row_distances in zip(indices, distances)
+        ]
+
+    def nearest(self, color, k=1, de2000=False):
+        """Return the k nearest entries to one color given as '#rrggbb' or an RGB tuple."""
+        rgb = hex_to_rgb_array([color]) if isinstance(color, str) else [color]
+        return self.nearest_batch(rgb, k=k, de2000=de2000)[0]
+
+    def within(self, color, radius):
+        """Return entries within a CIE76 Delta E radius of one color, closest first."""
+        rgb = hex_to_rgb_array([color]) if isinstance(color, str) else [color]
+        lab = srgb_to_lab(np.asarray(rgb, dtype=np.float64).reshape(-1, 3))[0]
+
+        if self.tree is not None:
+            indices = np.array(self.tree.query_ball_point(lab, radius), dtype=np.int64)
+        else:
+            indices = np.nonzero(np.linalg.norm(self.lab - lab, axis=1) <= radius)[0]
+
+        distances = np.linalg.norm(self.lab[indices] - lab, axis=1)
+        order = np.argsort(distances)
+        return [(self.entries[i], float(distances[j])) for j, i in zip(order, indices[order])]
+
+def main():
+    """Main function to look up the closest catalog colors from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.strip(), formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('colors', nargs='+', help="Colors to look up, as '#rrggbb'")
+    parser.add_argument('-k', type=int, default=3, help='Number of matches per color (default: 3)')
+    parser.add_argument('--radius', type=float, help='Return every match within this Delta E instead')
+    parser.add_argument('--de2000', action='store_true', help='Re-rank matches by CIEDE2000')
+    parser.add_argument('--catalog', default='colors.json', help='Catalog JSON (default: colors.json)')
+    args = parser.parse_args()
+
+    index = ColorIndex.from_json(args.catalog)
+
+    for color in args.colors:
+        if args.radius is not None:
+            matches = index.within(color, args.radius)
+        else:
+            matches = index.nearest(color, k=args.k, de2000=args.de2000)
+        print(color)
+        for entry, distance in matches:
+            print(f"  {entry['id']:<8} {entry['name']:<24} {entry['color']}  dE {distance:.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Script to recolor images to the closest producible catalog colors with a precomputed 3D LUT.
+
+The sRGB cube is quantized to size^3 cells (32 or 64 per channel) and the
+centre of each cell is mapped once to its nearest catalog color in CIELAB
+using color_index. Recoloring an image is then one vectorized table lookup
+per pixel. The LUT is cached on disk next to the catalog and rebuilt only
+when colors.json, the cube size or the distance metric change.
+
+Usage:
+    python color_lut.py mockup.jpg mockup_recolored.png --size 64
+"""
+
+import argparse
+import hashlib
+import os
+
+import numpy as np
+from PIL import Image
+
+from color_index import ColorIndex, hex_to_rgb_array, load_catalog
+
+LUT_SIZES = (16, 32, 64, 128)
+DEFAULT_LUT_SIZE = 32
+
+def catalog_hash(colors_file):
+    """Return the SHA-256 of the catalog file contents."""
+    with open(colors_file, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def default_cache_file(colors_file, size, de2000):
+    """Return the LUT cache path for a catalog, cube size and metric."""
+    metric = 'de2000' if de2000 else 'de76'
+    return os.path.join(os.path.dirname(os.path.abspath(colors_file)), f".color_lut_{size}_{metric}.npz")
+
+def build_lut(entries, size=DEFAULT_LUT_SIZE, de2000=False):
+    """Return a (size, size, size) array of catalog indices for the centre of each sRGB cell."""
+    step = 256 / size
+    centres = (np.arange(size) + 0.5) * step
+    r, g, b = np.meshgrid(centres, centres, centres, indexing='ij')
+    cells = np.stack([r.ravel(), g.ravel(), b.ravel()], axis=1)
+
+    indices = ColorIndex(entries).nearest_indices(cells, de2000=de2000)
+    return indices.astype(np.uint16).reshape(size, size, size)
+
+def load_lut(colors_file='colors.json', size=DEFAULT_LUT_SIZE, de2000=False, cache_file=None):
+    """Return (lut, palette, ids), loading the cached LUT or rebuilding it if the catalog changed."""
+    if size not in LUT_SIZES:
+        raise ValueError(f"size must be one of {LUT_SIZES}, got {size}")
+
+    cache_file = cache_file or default_cache_file(colors_file, size, de2000)
+    source_hash = catalog_hash(colors_file)
+
+    if os.path.exists(cache_file):
+        with np.load(cache_file) as cached:
+            if str(cached['catalog_hash']) == source_hash:
+                return cached['lut'], cached['palette'], list(cached['ids'])
+
+    entries = load_catalog(colors_file)
+    lut = build_lut(entries, size, de2000)
+    palette = hex_to_rgb_array([entry['color'] for entry in entries])
+    ids = [entry['id'] for entry in entries]
+
+    np.savez_compressed(cache_file, lut=lut, palette=palette, ids=np.array(ids),
+                        catalog_hash=np.array(source_hash))
+    return lut, palette, ids
+
+def lookup_indices(pixels, lut):
+    """Return the catalog index of each pixel in an (..., 3) uint8 array."""
+    shift = 8 - int(np.log2(lut.shape[0]))
+    cells = pixels >> shift
+    return lut[cells[..., 0], cells[..., 1], cells[..., 2]]
+
+def recolor_image(image, lut, palette):
+    """Return (recolored image, per-pixel catalog index array) for a Pillow image."""
+    pixels = np.asarray(image.convert('RGB'), dtype=np.uint8)
+    indices = lookup_indices(pixels, lut)
+    return Image.fromarray(palette[indices]), indices
+
+def main():
+    """Main function to recolor an image to catalog colors."""
+    parser = argparse.ArgumentParser(description=__doc__.strip(), formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('input', help='Image to recolor')
+    parser.add_argument('output', help='Recolored image to write')
+    parser.add_argument('--catalog', default='colors.json', help='Catalog JSON (default: colors.json)')
+    parser.add_argument('--size', type=int, choices=LUT_SIZES, default=DEFAULT_LUT_SIZE,
+                        help=f'Cells per channel in the LUT cube (default: {DEFAULT_LUT_SIZE})')
+    parser.add_argument('--de2000', action='store_true', help='Build the LUT with CIEDE2000 distances')
+    parser.add_argument('--top', type=int, default=10, help='Number of most used colors to report (default: 10)')
+    args = parser.parse_args()
+
+    lut, palette, ids = load_lut(args.catalog, args.size, args.de2000)
+
+    with Image.open(args.input) as image:
+        recolored, indices = recolor_image(image, lut, palette)
+    recolored.save(args.output)
+
+    print(f"Recolored image saved: {args.output}")
+    counts = np.bincount(indices.ravel(), minlength=len(ids))
+    for i in np.argsort(counts)[::-1][:args.top]:
+        if counts[i]:
+            print(f"  {ids[i]:<8} {counts[i] / indices.size:6.1%}")
+
+if __name__ == "__main__":
+    main()
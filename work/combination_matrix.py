@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Script to precompute a predicted color for every underglaze x glaze pair in a packed binary file.
+
+The glaze layer is blended over the underglaze with a configurable model,
+vectorized with NumPy over the whole matrix at once:
+
+    normal:   blend = glaze
+    multiply: blend = underglaze * glaze
+    screen:   blend = 1 - (1 - underglaze) * (1 - glaze)
+
+    result = (1 - opacity) * underglaze + opacity * blend
+
+Blending is done in linear light by default. Rows are underglazes and
+columns are glazes, matching the UG-xx-SC-xx cell keys in matrix.html.
+
+File layout (little-endian), readable with a DataView in the browser:
+
+    magic    4s   b'CCMX'
+    version  u16
+    channels u16  (3, RGB)
+    rows     u32
+    cols     u32
+    ids_len  u32  length of the id table
+    ids      UTF-8, newline-separated row ids then column ids
+    padding  to a 4-byte boundary
+    colors   rows * cols * 3 uint8, row-major
+"""
+
+import argparse
+import json
+import struct
+
+import numpy as np
+
+from color_index import hex_to_rgb_array
+
+MAGIC = b'CCMX'
+VERSION = 1
+HEADER = struct.Struct('<4sHHIII')
+BLEND_MODELS = ('normal', 'multiply', 'screen')
+
+def srgb_to_linear(values):
+    """Convert sRGB values in 0-1 to linear light."""
+    return np.where(values <= 0.04045, values / 12.92, ((values + 0.055) / 1.055) ** 2.4)
+
+def linear_to_srgb(values):
+    """Convert linear-light values in 0-1 to sRGB."""
+    return np.where(values <= 0.0031308, values * 12.92, 1.055 * np.power(values, 1 / 2.4) - 0.055)
+
+def blend_matrix(underglaze_rgb, glaze_rgb, model='multiply', opacity=0.6, linear=True):
+    """Return a (rows, cols, 3) uint8 array of glaze layered over underglaze for every pair."""
+    if model not in BLEND_MODELS:
+        raise ValueError(f"model must be one of {BLEND_MODELS}, got {model}")
+
+    under = np.asarray(underglaze_rgb, dtype=np.float64)[:, None, :] / 255.0
+    over = np.asarray(glaze_rgb, dtype=np.float64)[None, :, :] / 255.0
+    if linear:
+        under, over = srgb_to_linear(under), srgb_to_linear(over)
+
+    if model == 'normal':
+        blend = np.broadcast_to(over, np.broadcast_shapes(under.shape, over.shape))
+    elif model == 'multiply':
+        blend = under * over
+    else:
+        blend = 1 - (1 - under) * (1 - over)
+
+    result = (1 - opacity) * under + opacity * blend
+    if linear:
+        result = linear_to_srgb(result)
+    return np.clip(np.rint(result * 255), 0, 255).astype(np.uint8)
+
+def write_matrix(path, row_ids, col_ids, colors):
+    """Write the packed matrix file and return its size in bytes."""
+    ids = '\n'.join(list(row_ids) + list(col_ids)).encode('utf-8')
+    header = HEADER.pack(MAGIC, VERSION, 3, len(row_ids), len(col_ids), len(ids))
+    padding = b'\0' * (-(len(header) + len(ids)) % 4)
+
+    with open(path, 'wb') as f:
+        f.write(header)
+        f.write(ids)
+        f.write(padding)
+        f.write(np.ascontiguousarray(colors, dtype=np.uint8).tobytes())
+
+    return len(header) + len(ids) + len(padding) + colors.size
+
+def read_matrix(path):
+    """Read a packed matrix file and return (row_ids, col_ids, (rows, cols, 3) uint8 array)."""
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    magic, version, channels, rows, cols, ids_len = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a version {VERSION} combination matrix")
+
+    ids = data[HEADER.size:HEADER.size + ids_len].decode('utf-8').split('\n')
+    offset = HEADER.size + ids_len
+    offset += -offset % 4
+
+    colors = np.frombuffer(data, dtype=np.uint8, count=rows * cols * channels, offset=offset)
+    return ids[:rows], ids[rows:], colors.reshape(rows, cols, channels)
+
+def main():
+    """Main function to build the combination matrix from colors.json."""
+    parser = argparse.ArgumentParser(description=__doc__.strip(), formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--colors', default='colors.json', help='Catalog JSON (default: colors.json)')
+    parser.add_argument('--output', default='combinations.bin', help='Output file (default: combinations.bin)')
+    parser.add_argument('--model', choices=BLEND_MODELS, default='multiply',
+                        help='Blend model for the glaze layer (default: multiply)')
+    parser.add_argument('--opacity', type=float, default=0.6,
+                        help='Glaze layer opacity from 0 (transparent) to 1 (opaque) (default: 0.6)')
+    parser.add_argument('--srgb', action='store_true', help='Blend in sRGB instead of linear light')
+    args = parser.parse_args()
+
+    with open(args.colors, 'r', encoding='utf-8') as f:
+        colors_data = json.load(f)
+
+    underglazes = colors_data['underglazes']
+    glazes = colors_data['glazes']
+
+    colors = blend_matrix(
+        hex_to_rgb_array([underglaze['left'] for underglaze in underglazes]),
+        hex_to_rgb_array([glaze['color'] for glaze in glazes]),
+        model=args.model, opacity=args.opacity, linear=not args.srgb
+    )
+    size = write_matrix(args.output, [u['id'] for u in underglazes], [g['id'] for g in glazes], colors)
+
+    print(f"Combination matrix created: {args.output}")
+    print(f"{len(underglazes)} underglazes x {len(glazes)} glazes = {len(underglazes) * len(glazes)} pairs, {size} bytes")
+
+if __name__ == "__main__":
+    main()
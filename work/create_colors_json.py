@@ -1,51 +1,225 @@
 #!/usr/bin/env python3
 """
 Script to create a JSON file combining glazes and underglazes color data.
+
+Colors are queried from the catalog database (catalog_db), across every
+brand it holds, and merged into the existing file by id:
+
+    - fields the builder owns (name, colors, dominant colors and, with
+      --thumbnails, thumbnails) are replaced; other fields such as brand
+      and image are kept, and only filled in for new entries
+    - entries whose product was pruned from a scraped catalog section are
+      removed; entries the database never produced (e.g. the Amaco ones
+      added by amaco/extract-colors.js) are kept as they are
+    - existing entries keep their place in the file, which is the curated
+      order the swatch pages show, and new entries are appended in catalog
+      order; fields are written in a fixed order, so the same data always
+      gives the same bytes
+
+The file is only rewritten when its content changes, and a summary of the
+added, removed and changed entries is printed, so server reloads and
+browser cache churn only follow real data changes.
 """
 
-import csv
+import argparse
 import json
+import os
+from contextlib import closing
+
+from build_thumbnails import thumbnail_fields
+from catalog_db import DEFAULT_DB, SECTIONS, add_db_argument, catalog_colors, connect, ensure_section, retired_codes
+from dominant_colors import parse_dominant
+from metrics import count, timer
+
+# Fields the builder replaces on every run, per colors.json section
+OWNED_FIELDS = {
+    'glazes': ('name', 'color', 'dominant', 'thumbnail', 'thumbnail_srcset'),
+    'underglazes': ('name', 'left', 'top', 'dominant', 'thumbnail', 'thumbnail_srcset')
+}
+
+# Fields only set when an entry is new, so hand edits survive rebuilds
+DEFAULT_FIELDS = ('brand', 'image')
+
+FIELD_ORDER = ['id', 'brand', 'name', 'color', 'left', 'top', 'image', 'dominant', 'thumbnail', 'thumbnail_srcset']
+
+def dominant_fields(row):
+    """Return the dominant colors of a catalog row as colors.json fields, if it has any."""
+    dominant = parse_dominant(row['dominant_colors'])
+    return {"dominant": dominant} if dominant else {}
+
+def build_entries(db_file=DEFAULT_DB, thumbnails=False):
+    """Return the colors.json entries for every product with extracted colors, and the retired ids, by section.
+
+    Thumbnail fields are only added with thumbnails=True, since thumbnails/
+    is a build artifact that is not committed or deployed with colors.json.
+    """
+    thumbnail = thumbnail_fields if thumbnails else lambda image_path: {}
 
-def create_colors_json():
-    """Create a JSON file with combined glazes and underglazes color data."""
-    
-    # Read glazes data
-    glazes = []
-    with open('glaze_colors.csv', 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            # For glazes, use the left color as the main color
-            glazes.append({
+    conn = connect(db_file)
+    for section in SECTIONS.values():
+        ensure_section(conn, section)
+
+    with closing(conn):
+        # For glazes, use the left color as the main color
+        glazes = [
+            {
                 "id": row['code'],
+                "brand": row['brand'],
                 "name": row['color_name'],
-                "color": row['left_color_hex']
-            })
-    
-    # Read underglazes data
-    underglazes = []
-    with open('underglaze_colors.csv', 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            underglazes.append({
+                "color": row['left_color_hex'],
+                "image": row['local_image_path'],
+                **dominant_fields(row),
+                **thumbnail(row['local_image_path'])
+            }
+            for row in catalog_colors(conn, 'glaze')
+        ]
+
+        underglazes = [
+            {
                 "id": row['code'],
+                "brand": row['brand'],
                 "name": row['color_name'],
                 "left": row['left_color_hex'],
-                "top": row['top_color_hex']
-            })
-    
-    # Create the combined data structure
+                "top": row['top_color_hex'],
+                "image": row['local_image_path'],
+                **dominant_fields(row),
+                **thumbnail(row['local_image_path'])
+            }
+            for row in catalog_colors(conn, 'underglaze')
+        ]
+
+        retired = {"glazes": retired_codes(conn, 'glaze'), "underglazes": retired_codes(conn, 'underglaze')}
+
+    return {"glazes": glazes, "underglazes": underglazes}, retired
+
+def order_fields(entry):
+    """Return an entry with its fields in FIELD_ORDER, then any others alphabetically."""
+    known = [field for field in FIELD_ORDER if field in entry]
+    others = sorted(field for field in entry if field not in FIELD_ORDER)
+    return {field: entry[field] for field in known + others}
+
+def merge_entry(old, entry, owned):
+    """Return an existing entry updated with the owned fields of a built one."""
+    new = {field: value for field, value in old.items() if field not in owned}
+    new.update((field, entry[field]) for field in owned if entry.get(field) is not None)
+    new['id'] = entry['id']
+    for field in DEFAULT_FIELDS:
+        if new.get(field) is None and entry.get(field) is not None:
+            new[field] = entry[field]
+    return order_fields(new)
+
+def merge_section(existing, built, owned, retired):
+    """Merge built entries into a section's existing entries by id.
+
+    Existing entries stay in file order and new ones are appended in the
+    order they were built (catalog order). Entries whose id is retired (pruned
+    from the catalog) are dropped, whatever their brand field says; entries
+    the database never produced are kept unchanged.
+    """
+    built_by_id = {entry['id']: entry for entry in built}
+
+    merged = [
+        merge_entry(old, built_by_id[old['id']], owned) if old['id'] in built_by_id else old
+        for old in existing if old['id'] in built_by_id or old['id'] not in retired
+    ]
+
+    previous = {entry['id'] for entry in existing}
+    merged.extend(merge_entry({}, entry, owned) for entry in built if entry['id'] not in previous)
+    return merged
+
+def diff_section(existing, merged):
+    """Return (added, removed, changed) for a section, where changed maps ids to changed field names."""
+    before = {entry['id']: entry for entry in existing}
+    after = {entry['id']: entry for entry in merged}
+
+    added = [entry_id for entry_id in after if entry_id not in before]
+    removed = [entry_id for entry_id in before if entry_id not in after]
+    changed = {}
+    for entry_id in after.keys() & before.keys():
+        fields = sorted(field for field in after[entry_id].keys() | before[entry_id].keys()
+                        if after[entry_id].get(field) != before[entry_id].get(field))
+        if fields:
+            changed[entry_id] = fields
+
+    return added, removed, {entry_id: changed[entry_id] for entry_id in after if entry_id in changed}
+
+def print_summary(name, added, removed, changed):
+    """Print the changes to one colors.json section."""
+    print(f"{name}: {len(added)} added, {len(removed)} removed, {len(changed)} changed")
+    for entry_id in added:
+        print(f"  + {entry_id}")
+    for entry_id in removed:
+        print(f"  - {entry_id}")
+    for entry_id, fields in changed.items():
+        print(f"  ~ {entry_id} ({', '.join(fields)})")
+
+def load_colors_json(colors_file):
+    """Return the parsed colors.json and its exact text, or ({}, None) if it does not exist."""
+    if not os.path.exists(colors_file):
+        return {}, None
+    with open(colors_file, 'r', encoding='utf-8') as f:
+        text = f.read()
+    return json.loads(text), text
+
+def create_colors_json(db_file=DEFAULT_DB, colors_file='colors.json', dry_run=False, thumbnails=False):
+    """Merge the catalog's colors into colors_file; return True if its content changed."""
+
+    # Thumbnail paths are relative to the working directory, so they only resolve next to a colors.json in it
+    if thumbnails and os.path.dirname(os.path.abspath(colors_file)) != os.getcwd():
+        print(f"Skipping thumbnails: their paths would not resolve from {colors_file}; "
+              f"run from the directory colors.json is served from")
+        thumbnails = False
+
+    existing, existing_text = load_colors_json(colors_file)
+    built, retired = build_entries(db_file, thumbnails)
+
+    # Create the combined data structure, keeping any other top-level keys
     colors_data = {
-        "glazes": glazes,
-        "underglazes": underglazes
+        name: merge_section(existing.get(name, []), built[name], OWNED_FIELDS[name], retired[name])
+        for name in ('glazes', 'underglazes')
     }
-    
-    # Write to JSON file
-    with open('colors.json', 'w', encoding='utf-8') as f:
-        json.dump(colors_data, f, indent=2, ensure_ascii=False)
-    
-    print(f"Created colors.json with {len(glazes)} glazes and {len(underglazes)} underglazes")
+    colors_data.update((key, value) for key, value in existing.items() if key not in colors_data)
+
+    for name in ('glazes', 'underglazes'):
+        print_summary(name, *diff_section(existing.get(name, []), colors_data[name]))
+
+    text = json.dumps(colors_data, indent=2, ensure_ascii=False)
+    if text == existing_text:
+        print(f"{colors_file} is up to date, not rewritten")
+        return False
+    if existing_text is not None and json.loads(existing_text) == colors_data:
+        print(f"{colors_file}: entries or fields reordered")
+
+    if dry_run:
+        print(f"Would update {colors_file}")
+        return True
+
+    # Write to a temporary file and rename, so readers never see a partial file
+    tmp_file = f"{colors_file}.tmp"
+    with timer('write_json'), open(tmp_file, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_file, colors_file)
+    count('write_json', 'bytes', os.path.getsize(colors_file))
+
+    glazes, underglazes = colors_data['glazes'], colors_data['underglazes']
+    print(f"Updated {colors_file} with {len(glazes)} glazes and {len(underglazes)} underglazes")
     print(f"Total colors: {len(glazes) + len(underglazes)}")
+    return True
 
-if __name__ == "__main__":
-    create_colors_json()
+def main():
+    """Main function to update colors.json from the catalog database."""
+    parser = argparse.ArgumentParser(description=__doc__.strip(), formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_db_argument(parser)
+    parser.add_argument('--output', default='colors.json',
+                        help='colors.json to merge into and update (default: colors.json)')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Print the change summary without writing the file')
+    parser.add_argument('--thumbnails', action='store_true',
+                        help='Add thumbnail paths for images whose thumbnails exist; only use this where '
+                             'thumbnails/ is deployed alongside colors.json')
+    args = parser.parse_args()
 
+    create_colors_json(args.db, args.output, args.dry_run, args.thumbnails)
+
+if __name__ == "__main__":
+    main()
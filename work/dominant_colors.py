@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Dominant-color extraction with mini-batch k-means over the glaze region of a tile photo.
+
+A single blurred sample misrepresents speckled and variegated glazes, so
+this clusters the pixels of a central tile region instead and reports the
+top k colors with the share of the region each one covers. To keep it to a
+few milliseconds per image the region is decoded at reduced JPEG scale and
+downsampled to at most MAX_PIXELS pixels, then clustered with mini-batch
+k-means (k-means++ seeding, fixed random seed) in NumPy, so the same image
+always gives the same colors. The extraction scripts cluster the image they
+already decoded for the point samples (batch_extract.extract_image), so
+--dominant adds no second decode.
+
+Usage:
+    python dominant_colors.py glaze_images/sc-16_cone06.jpg -k 5
+"""
+
+import argparse
+import math
+
+import numpy as np
+
+from color_sampling import DECODE_SCALES, open_image
+from region_sampler import image_to_array
+
+# Tile region as (left, top, right, bottom) fractions, centred on the left sample point
+DOMINANT_REGION = (0.25, 0.3, 0.65, 0.8)
+DEFAULT_K = 5
+MAX_PIXELS = 4096
+BATCH_SIZE = 512
+ITERATIONS = 30
+SEED = 0
+# Stop early once no center moves more than this (in 0-255 RGB units)
+TOLERANCE = 0.5
+
+def dominant_params(k=DEFAULT_K, region=DOMINANT_REGION, max_pixels=MAX_PIXELS, seed=SEED, decode_scale=None):
+    """Return the parameters that determine the dominant colors extracted from an image.
+
+    decode_scale is the scale the image was decoded at, or None when
+    region_pixels picks it.
+    """
+    return {
+        'mode': 'dominant',
+        'k': k,
+        'region': list(region),
+        'max_pixels': max_pixels,
+        'batch_size': BATCH_SIZE,
+        'iterations': ITERATIONS,
+        'seed': seed,
+        'decode_scale': decode_scale
+    }
+
+def region_pixels(image_path, region=DOMINANT_REGION, max_pixels=MAX_PIXELS):
+    """Return an (N, 3) float32 array of at most about max_pixels pixels from the tile region."""
+    with open_image(image_path)[0] as probe:
+        width, height = probe.size
+
+    # Decode at the smallest scale that still leaves max_pixels in the region
+    region_area = width * (region[2] - region[0]) * height * (region[3] - region[1])
+    decode_scale = max(scale for scale in DECODE_SCALES if scale == 1 or region_area / scale ** 2 >= max_pixels)
+
+    image, _ = open_image(image_path, decode_scale)
+    with image:
+        return image_region_pixels(image, region, max_pixels)
+
+def image_region_pixels(image, region=DOMINANT_REGION, max_pixels=MAX_PIXELS):
+    """Return an (N, 3) float32 array of at most about max_pixels pixels from the tile region of a decoded image."""
+    width, height = image.size
+    box = (
+        int(region[0] * width), int(region[1] * height),
+        max(int(region[2] * width), int(region[0] * width) + 1),
+        max(int(region[3] * height), int(region[1] * height) + 1)
+    )
+    patch = image.crop(box)
+
+    factor = math.ceil(math.sqrt(patch.width * patch.height / max_pixels))
+    if factor > 1:
+        patch = patch.reduce(factor)
+    return image_to_array(patch).reshape(-1, 3).astype(np.float32)
+
+def nearest_center(pixels, centers):
+    """Return the index of the closest center for each pixel."""
+    distances = (
+        (pixels ** 2).sum(axis=1)[:, None]
+        - 2 * pixels @ centers.T
+        + (centers ** 2).sum(axis=1)[None, :]
+    )
+    return np.argmin(distances, axis=1)
+
+def kmeans_plus_plus(pixels, k, rng):
+    """Pick k initial centers spread out over the pixels (k-means++ seeding)."""
+    centers = [pixels[rng.integers(len(pixels))]]
+    closest = ((pixels - centers[0]) ** 2).sum(axis=1)
+
+    for _ in range(1, k):
+        total = closest.sum()
+        if total == 0:
+            break
+        center = pixels[rng.choice(len(pixels), p=closest / total)]
+        centers.append(center)
+        closest = np.minimum(closest, ((pixels - center) ** 2).sum(axis=1))
+
+    return np.array(centers, dtype=np.float32)
+
+def minibatch_kmeans(pixels, k=DEFAULT_K, batch_size=BATCH_SIZE, iterations=ITERATIONS, seed=SEED):
+    """Cluster an (N, 3) pixel array and return (centers, proportions) sorted by proportion."""
+    rng = np.random.default_rng(seed)
+    centers = kmeans_plus_plus(pixels, min(k, len(pixels)), rng)
+    counts = np.zeros(len(centers))
+
+    for _ in range(iterations):
+        batch = pixels[rng.integers(0, len(pixels), min(batch_size, len(pixels)))]
+        labels = nearest_center(batch, centers)
+
+        # Move each center towards the running mean of every pixel assigned to it so far
+        batch_counts = np.bincount(labels, minlength=len(centers))
+        sums = np.stack([np.bincount(labels, weights=batch[:, c], minlength=len(centers)) for c in range(3)], axis=1)
+        counts += batch_counts
+        updated = batch_counts > 0
+        shift = (sums[updated] - batch_counts[updated, None] * centers[updated]) / counts[updated, None]
+        centers[updated] += shift.astype(np.float32)
+        if np.abs(shift).max() < TOLERANCE:
+            break
+
+    labels = nearest_center(pixels, centers)
+    proportions = np.bincount(labels, minlength=len(centers)) / len(pixels)
+    order = np.argsort(-proportions, kind='stable')
+    keep = order[proportions[order] > 0]
+    return centers[keep], proportions[keep]
+
+def extract_dominant_colors(image_path, k=DEFAULT_K, region=DOMINANT_REGION, max_pixels=MAX_PIXELS, seed=SEED):
+    """Return [(rgb tuple, proportion), ...] for the k dominant colors of an image, largest first."""
+    try:
+        return cluster_colors(region_pixels(image_path, region, max_pixels), k, seed)
+    except Exception as e:
+        print(f"Error processing {image_path}: {e}")
+        return []
+
+def cluster_colors(pixels, k=DEFAULT_K, seed=SEED):
+    """Return [(rgb tuple, proportion), ...] for the k dominant colors of an (N, 3) pixel array, largest first."""
+    centers, proportions = minibatch_kmeans(pixels, k, seed=seed)
+    return [
+        (tuple(int(v) for v in np.clip(np.rint(center), 0, 255)), round(float(proportion), 4))
+        for center, proportion in zip(centers, proportions)
+    ]
+
+def format_dominant(colors):
+    """Format dominant colors for a CSV cell as '#rrggbb:0.4200 #rrggbb:0.3100 ...'."""
+    return ' '.join(f"#{r:02x}{g:02x}{b:02x}:{share:.4f}" for (r, g, b), share in colors)
+
+def parse_dominant(text):
+    """Parse a dominant colors CSV cell into [{'color': '#rrggbb', 'share': 0.42}, ...]."""
+    colors = []
+    for token in (text or '').split():
+        color, share = token.split(':')
+        colors.append({'color': color, 'share': float(share)})
+    return colors
+
+def main():
+    """Main function to print the dominant colors of images."""
+    parser = argparse.ArgumentParser(description=__doc__.strip(), formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('images', nargs='+', help='Images to analyse')
+    parser.add_argument('-k', type=int, default=DEFAULT_K, help=f'Number of colors (default: {DEFAULT_K})')
+    parser.add_argument('--seed', type=int, default=SEED, help=f'Random seed (default: {SEED})')
+    args = parser.parse_args()
+
+    for image_path in args.images:
+        print(image_path)
+        for (r, g, b), share in extract_dominant_colors(image_path, args.k, seed=args.seed):
+            print(f"  #{r:02x}{g:02x}{b:02x}  {share:6.1%}")
+
+if __name__ == "__main__":
+    main()
@@ -3,123 +3,75 @@
 Script to extract Cone 06 underglaze data from HTML file and create CSV with image downloads.
 """
 
-import re
-import csv
+import argparse
 import os
-import requests
-from bs4 import BeautifulSoup
+from contextlib import closing
 from urllib.parse import urlparse
-import time
+
+from catalog_db import SECTIONS, add_db_argument, connect, export_products_csv, upsert_products
+from catalog_index import build_index, lookup
+from image_downloader import FAILED, add_download_arguments, download_images, metadata_file_from_args
 
 def extract_underglaze_data(html_file):
     """Extract Cone 06 underglaze data from HTML file."""
     
-    with open(html_file, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    soup = BeautifulSoup(content, 'html.parser')
-    
-    # Find all product divs
-    products = soup.find_all('div', class_='mayco-product')
-    
     cone06_data = []
     
-    for product in products:
-        # Check if this is a Cone 06 product by looking for the small em tag
-        small_em = product.find('small')
-        if small_em and small_em.find('em') and 'Cone 06' in small_em.get_text():
-            
-            # Extract image URL
-            img_tag = product.find('img', class_='product-featured-image')
-            if img_tag:
-                image_url = img_tag.get('src')
-                
-                # Extract code and color name from the text content
-                # The structure is: <br /> UG-XX <br /> Color Name <br />
-                text_content = product.get_text()
-                lines = [line.strip() for line in text_content.split('\n') if line.strip()]
-                
-                # Look for the pattern: UG-XX, Color Name, (Cone 06)
-                for i, line in enumerate(lines):
-                    if line.startswith('UG-') and i + 1 < len(lines):
-                        code = line
-                        color_name = lines[i + 1]
-                        if i + 2 < len(lines) and 'Cone 06' in lines[i + 2]:
-                            cone06_data.append({
-                                'code': code,
-                                'color_name': color_name,
-                                'image_url': image_url
-                            })
-                            break
+    # Keep Cone 06 underglazes that have an image
+    for product in lookup(build_index([html_file]), prefix='UG', cone='06'):
+        if product['image_url']:
+            cone06_data.append({
+                'code': product['code'],
+                'color_name': product['color_name'],
+                'image_url': product['image_url']
+            })
     
     return cone06_data
 
-def download_image(url, filename, folder='underglaze_images'):
-    """Download an image from URL to specified folder."""
-    
-    # Create folder if it doesn't exist
-    os.makedirs(folder, exist_ok=True)
-    
-    try:
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
-        
-        filepath = os.path.join(folder, filename)
-        with open(filepath, 'wb') as f:
-            f.write(response.content)
-        
-        print(f"Downloaded: {filename}")
-        return True
-        
-    except Exception as e:
-        print(f"Failed to download {url}: {e}")
-        return False
-
-def create_csv(data, filename='underglazes_cone06.csv'):
-    """Create CSV file with underglaze data."""
+def create_csv(data, db_file):
+    """Upsert underglaze data into the catalog database and export the CSV view."""
     
-    with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-        fieldnames = ['code', 'color_name', 'image_url', 'local_image_path']
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        
-        writer.writeheader()
-        for item in data:
-            writer.writerow(item)
+    section = SECTIONS['underglazes']
+    with closing(connect(db_file)) as conn:
+        upsert_products(conn, data, section['kind'], section['brand'], section['cone'], prune=True)
+        export_products_csv(conn, section)
 
 def main():
     """Main function to extract data and download images."""
     
-    html_file = '/Users/john.brown/servicenow/underglazes.html'
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--html', default='underglazes.html',
+                        help='Saved underglaze catalog page (default: underglazes.html)')
+    add_download_arguments(parser)
+    add_db_argument(parser)
+    args = parser.parse_args()
     
-    print("Extracting Cone 06 underglaze data...")
-    cone06_data = extract_underglaze_data(html_file)
+    print(f"Extracting Cone 06 underglaze data from {args.html}...")
+    cone06_data = extract_underglaze_data(args.html)
     
     print(f"Found {len(cone06_data)} Cone 06 underglazes")
     
-    # Download images and update data with local paths
-    print("Downloading images...")
-    for i, item in enumerate(cone06_data):
+    # Add local image paths to data
+    for item in cone06_data:
         # Extract filename from URL
         parsed_url = urlparse(item['image_url'])
         filename = os.path.basename(parsed_url.path)
-        
-        # Add local image path to data
         item['local_image_path'] = f"underglaze_images/{filename}"
-        
-        # Download image
-        success = download_image(item['image_url'], filename)
-        if not success:
+    
+    # Download images concurrently, paced per host instead of a fixed delay
+    print("Downloading images...")
+    jobs = [(item['image_url'], item['local_image_path']) for item in cone06_data]
+    statuses = download_images(jobs, workers=args.download_workers,
+                               requests_per_second=args.requests_per_second,
+                               metadata_file=metadata_file_from_args(args))
+    
+    for item, status in zip(cone06_data, statuses):
+        if status == FAILED:
             item['local_image_path'] = "DOWNLOAD_FAILED"
-        
-        # Add small delay to be respectful to the server
-        time.sleep(0.5)
-        
-        if (i + 1) % 10 == 0:
-            print(f"Downloaded {i + 1}/{len(cone06_data)} images...")
     
     # Create CSV file
     print("Creating CSV file...")
-    create_csv(cone06_data)
+    create_csv(cone06_data, args.db)
     
     print(f"CSV file created: underglazes_cone06.csv")
     print(f"Images downloaded to: underglaze_images/")
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Persistent cache of extracted colors keyed by image content and sampling parameters.
+
+Each entry is stored under a hash of the image bytes plus the parameters
+returned by color_sampling.sampling_params(), so renamed files still hit the
+cache and changing a sample position or blur radius invalidates old entries.
+"""
+
+import hashlib
+import json
+import os
+
+from state_file import update_json
+
+CACHE_VERSION = 1
+DEFAULT_CACHE_FILE = '.extraction_cache.json'
+
+def file_hash(path, chunk_size=1024 * 1024):
+    """Return the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def cache_key(image_path, params):
+    """Return the cache key for an image and sampling parameters, or None if unreadable."""
+    try:
+        content_hash = file_hash(image_path)
+    except OSError:
+        return None
+
+    payload = json.dumps({'image': content_hash, 'params': params}, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def load_cache(cache_file=DEFAULT_CACHE_FILE):
+    """Load the cache entries from disk, returning an empty cache if missing or stale."""
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    if data.get('version') != CACHE_VERSION:
+        return {}
+    return data.get('entries', {})
+
+def save_cache(entries, cache_file=DEFAULT_CACHE_FILE):
+    """Merge the cache entries into the cache file atomically, keeping entries other runs saved meanwhile."""
+    def merge(data):
+        merged = data.get('entries', {}) if data.get('version') == CACHE_VERSION else {}
+        merged.update(entries)
+        return {'version': CACHE_VERSION, 'entries': merged}
+
+    update_json(cache_file, merge, sort_keys=True)
+
+def clear_cache(cache_file=DEFAULT_CACHE_FILE):
+    """Delete the cache file if it exists."""
+    if os.path.exists(cache_file):
+        os.remove(cache_file)
+
+def get_colors(entries, key):
+    """Return the cached (left_color, top_color) for a key, or None on a miss."""
+    entry = entries.get(key) if key else None
+    if not entry:
+        return None
+    return tuple(entry['left_color']), tuple(entry['top_color'])
+
+def put_colors(entries, key, left_color, top_color):
+    """Store extracted colors for a key, skipping failed extractions."""
+    if key and left_color and top_color:
+        entries[key] = {'left_color': list(left_color), 'top_color': list(top_color)}
+
+def get_dominant(entries, key):
+    """Return the cached dominant [(rgb, proportion), ...] colors for a key, or None on a miss."""
+    entry = entries.get(key) if key else None
+    if not entry:
+        return None
+    return [(tuple(color[:3]), color[3]) for color in entry['dominant']]
+
+def put_dominant(entries, key, colors):
+    """Store dominant colors for a key, skipping failed extractions."""
+    if key and colors:
+        entries[key] = {'dominant': [list(rgb) + [proportion] for rgb, proportion in colors]}
+
+def add_cache_arguments(parser):
+    """Add the cache command-line options to an argparse parser."""
+    parser.add_argument('--cache-file', default=DEFAULT_CACHE_FILE,
+                        help=f'Extraction cache file (default: {DEFAULT_CACHE_FILE})')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Extract every image without reading or writing the cache')
+    parser.add_argument('--clear-cache', action='store_true',
+                        help='Invalidate the cache before extracting')
+
+def cache_from_args(args):
+    """Return the cache entries selected by the command-line options, or None if disabled."""
+    if args.clear_cache:
+        clear_cache(args.cache_file)
+    if args.no_cache:
+        return None
+    return load_cache(args.cache_file)
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Shared concurrent image downloader for the catalog scrapers.
+
+Downloads reuse pooled HTTP connections through one requests.Session, run on
+a bounded thread pool, and are paced by a per-host token bucket instead of a
+fixed sleep between requests. A sidecar metadata file records the ETag,
+Last-Modified, size and hash of each downloaded URL so re-runs send
+conditional requests and unchanged images cost a single 304. Bodies are
+streamed to disk through a temporary file, so memory stays flat regardless of
+image size and interrupted downloads resume where they stopped. A finished
+file must match the server's Digest/Content-MD5 and, when resumed, the hash
+recorded for the same validator before it is renamed into place.
+"""
+
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import count, timer
+from state_file import update_json
+
+DEFAULT_WORKERS = 8
+DEFAULT_REQUESTS_PER_SECOND = 4.0
+DEFAULT_METADATA_FILE = '.download_meta.json'
+CHUNK_SIZE = 64 * 1024
+
+# Digest header algorithm names -> the digests stream_to_file computes
+DIGEST_ALGORITHMS = {'sha-256': 'sha256', 'md5': 'md5'}
+
+# Download outcomes reported per URL
+FETCHED = 'fetched'
+UNCHANGED = 'unchanged'
+FAILED = 'failed'
+
+class RateLimiter:
+    """Thread-safe token bucket that limits requests per second for each host."""
+
+    def __init__(self, requests_per_second=DEFAULT_REQUESTS_PER_SECOND, burst=None):
+        self.rate = requests_per_second
+        self.burst = burst if burst is not None else max(1.0, requests_per_second)
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def acquire(self, url):
+        """Block until a request to the URL's host is allowed."""
+        if not self.rate or self.rate <= 0:
+            return
+
+        host = urlparse(url).netloc
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                tokens, updated = self.buckets.get(host, (self.burst, now))
+                tokens = min(self.burst, tokens + (now - updated) * self.rate)
+                if tokens >= 1:
+                    self.buckets[host] = (tokens - 1, now)
+                    return
+                self.buckets[host] = (tokens, now)
+                wait = (1 - tokens) / self.rate
+            time.sleep(wait)
+
+def create_session(pool_size=DEFAULT_WORKERS):
+    """Create a requests session whose connection pool fits pool_size concurrent downloads."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+def load_metadata(metadata_file=DEFAULT_METADATA_FILE):
+    """Load per-URL download metadata, returning an empty store if missing or unreadable."""
+    try:
+        with open(metadata_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_metadata(metadata, metadata_file=DEFAULT_METADATA_FILE):
+    """Merge per-URL download metadata into the metadata file atomically, keeping other runs' URLs."""
+    update_json(metadata_file, lambda data: {**data, **metadata}, indent=2, sort_keys=True)
+
+def conditional_headers(entry, local_path):
+    """Return If-None-Match/If-Modified-Since headers if the local copy matches the recorded entry."""
+    if not entry or entry.get('path') != local_path:
+        return {}
+    if not os.path.exists(local_path) or os.path.getsize(local_path) != entry.get('size'):
+        return {}
+
+    headers = {}
+    if entry.get('etag'):
+        headers['If-None-Match'] = entry['etag']
+    if entry.get('last_modified'):
+        headers['If-Modified-Since'] = entry['last_modified']
+    return headers
+
+def resume_headers(part_path):
+    """Return Range/If-Range headers to resume a partial download, or {} to start over.
+
+    A partial file is only resumed when its validator was recorded, so a
+    changed image on the server restarts the download instead of splicing
+    two versions together.
+    """
+    try:
+        offset = os.path.getsize(part_path)
+        with open(f"{part_path}.json", 'r', encoding='utf-8') as f:
+            validator = json.load(f).get('validator')
+    except (OSError, ValueError):
+        return {}
+
+    if not offset or not validator:
+        return {}
+    return {'Range': f"bytes={offset}-", 'If-Range': validator}
+
+def discard_partial(part_path):
+    """Remove a partial download and its validator file."""
+    for path in (part_path, f"{part_path}.json"):
+        if os.path.exists(path):
+            os.remove(path)
+
+def expected_size(response):
+    """Return the full file size promised by the response headers, or None if unknown."""
+    if response.headers.get('Content-Encoding'):
+        return None
+    if response.status_code == 206:
+        total = response.headers.get('Content-Range', '').rpartition('/')[2]
+        return int(total) if total.isdigit() else None
+    length = response.headers.get('Content-Length')
+    return int(length) if length and length.isdigit() else None
+
+def expected_digests(response, entry, validator):
+    """Return the {'sha256': hex, 'md5': hex} digests the whole downloaded file must match.
+
+    They come from the server's Repr-Digest, Digest and (for a full 200 body)
+    Content-MD5 headers, and from the SHA-256 recorded for an earlier
+    download with the same validator, which is what a resumed file must
+    reproduce. Unknown algorithms are ignored.
+    """
+    digests = {}
+    if entry and entry.get('sha256') and validator and validator in (entry.get('etag'), entry.get('last_modified')):
+        digests['sha256'] = entry['sha256']
+    if response.headers.get('Content-Encoding'):
+        return digests
+
+    # Repr-Digest: sha-256=:<base64>:  Digest: SHA-256=<base64>, MD5=<base64>
+    for header in ('Digest', 'Repr-Digest'):
+        for item in response.headers.get(header, '').split(','):
+            algorithm, _, value = item.strip().partition('=')
+            algorithm = DIGEST_ALGORITHMS.get(algorithm.lower())
+            if algorithm and value:
+                try:
+                    digests[algorithm] = base64.b64decode(value.strip(':'), validate=True).hex()
+                except ValueError:
+                    continue
+    if response.status_code == 200 and response.headers.get('Content-MD5'):
+        try:
+            digests['md5'] = base64.b64decode(response.headers['Content-MD5'], validate=True).hex()
+        except ValueError:
+            pass
+    return digests
+
+def stream_to_file(response, part_path, offset):
+    """Append the response body to the partial file in chunks and return the whole file's digests.
+
+    Returns {'sha256': hex, 'md5': hex}.
+    """
+    digests = {'sha256': hashlib.sha256(), 'md5': hashlib.md5(usedforsecurity=False)}
+
+    def update(chunk):
+        for digest in digests.values():
+            digest.update(chunk)
+
+    # Hash the bytes already on disk from an earlier attempt
+    if offset:
+        with open(part_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                update(chunk)
+
+    with open(part_path, 'ab' if offset else 'wb') as f:
+        for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+            f.write(chunk)
+            update(chunk)
+
+    return {algorithm: digest.hexdigest() for algorithm, digest in digests.items()}
+
+def download_image(url, local_path, session=None, rate_limiter=None, entry=None):
+    """Download an image from URL to local path.
+
+    Returns (status, metadata entry). When entry holds the metadata recorded
+    by a previous download, a conditional request is sent and an unchanged
+    image is reported without rewriting the local file. The body is streamed
+    in chunks to a .part file that is renamed into place only after its size
+    and any known digest have been checked (see expected_digests), so a crash
+    never leaves a truncated image behind and the next run resumes the
+    partial file with an HTTP Range request. A digest mismatch discards the
+    partial file so the next run downloads it from scratch.
+    """
+    with timer('download'):
+        status, entry = _download_image(url, local_path, session, rate_limiter, entry)
+    count('download', status)
+    return status, entry
+
+def _download_image(url, local_path, session, rate_limiter, entry):
+    """Download one image; see download_image."""
+    part_path = f"{local_path}.part"
+
+    try:
+        if rate_limiter:
+            rate_limiter.acquire(url)
+
+        headers = conditional_headers(entry, local_path) or resume_headers(part_path)
+
+        with (session or requests).get(url, headers=headers, timeout=30, stream=True) as response:
+            if response.status_code == 304 and 'Range' not in headers:
+                return UNCHANGED, entry
+
+            # The partial file is already complete or longer than the image, so start over
+            if response.status_code == 416 and 'Range' in headers:
+                discard_partial(part_path)
+                return _download_image(url, local_path, session, rate_limiter, entry)
+
+            response.raise_for_status()
+
+            # A 200 to a Range request means the image changed, so start over
+            offset = os.path.getsize(part_path) if response.status_code == 206 else 0
+
+            # Create directory if it doesn't exist
+            os.makedirs(os.path.dirname(local_path) or '.', exist_ok=True)
+
+            # Record the validator first so an interrupted download can resume
+            validator = response.headers.get('ETag') or response.headers.get('Last-Modified')
+            with open(f"{part_path}.json", 'w', encoding='utf-8') as f:
+                json.dump({'url': url, 'validator': validator}, f)
+
+            digests = stream_to_file(response, part_path, offset)
+            expected = expected_digests(response, entry, validator)
+            count('download', 'bytes', os.path.getsize(part_path) - offset)
+
+        size = os.path.getsize(part_path)
+        expected_bytes = expected_size(response)
+        if expected_bytes is not None and size != expected_bytes:
+            raise IOError(f"expected {expected_bytes} bytes, received {size}")
+
+        mismatched = [algorithm for algorithm, digest in expected.items() if digests[algorithm] != digest]
+        if mismatched:
+            # Resuming corrupt bytes would never converge, so start over next time
+            discard_partial(part_path)
+            count('download', 'digest_mismatch')
+            raise IOError(f"{', '.join(mismatched)} digest mismatch")
+
+        os.replace(part_path, local_path)
+        os.remove(f"{part_path}.json")
+
+        return FETCHED, {
+            'path': local_path,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'size': size,
+            'sha256': digests['sha256']
+        }
+    except Exception as e:
+        print(f"Failed to download {url}: {e}")
+        return FAILED, entry
+
+def download_images(jobs, workers=DEFAULT_WORKERS, requests_per_second=DEFAULT_REQUESTS_PER_SECOND,
+                    metadata_file=DEFAULT_METADATA_FILE):
+    """Download (url, local_path) jobs concurrently and return a status per job, in order.
+
+    Statuses are FETCHED, UNCHANGED or FAILED. Pass metadata_file=None to
+    download everything unconditionally without recording metadata.
+    """
+    jobs = list(jobs)
+    rate_limiter = RateLimiter(requests_per_second)
+    metadata = load_metadata(metadata_file) if metadata_file else {}
+    completed = 0
+    lock = threading.Lock()
+
+    def run(job):
+        nonlocal completed
+        url, local_path = job
+        status, entry = download_image(url, local_path, session, rate_limiter, metadata.get(url))
+        with lock:
+            if entry:
+                metadata[url] = entry
+            completed += 1
+            if completed % 10 == 0 or completed == len(jobs):
+                print(f"Downloaded {completed}/{len(jobs)} images...")
+        return status
+
+    with create_session(workers) as session:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            statuses = list(executor.map(run, jobs))
+
+    if metadata_file:
+        save_metadata(metadata, metadata_file)
+
+    print(f"Fetched {statuses.count(FETCHED)}, unchanged {statuses.count(UNCHANGED)}, "
+          f"failed {statuses.count(FAILED)}")
+    return statuses
+
+def add_download_arguments(parser):
+    """Add the downloader command-line options to an argparse parser."""
+    parser.add_argument('--download-workers', type=int, default=DEFAULT_WORKERS,
+                        help=f'Number of concurrent downloads (default: {DEFAULT_WORKERS})')
+    parser.add_argument('--requests-per-second', type=float, default=DEFAULT_REQUESTS_PER_SECOND,
+                        help=f'Request budget per host, 0 for unlimited (default: {DEFAULT_REQUESTS_PER_SECOND})')
+    parser.add_argument('--download-metadata', default=DEFAULT_METADATA_FILE,
+                        help=f'Sidecar file of ETag/Last-Modified data per URL (default: {DEFAULT_METADATA_FILE})')
+    parser.add_argument('--force-download', action='store_true',
+                        help='Download every image unconditionally and do not record metadata')
+
+def metadata_file_from_args(args):
+    """Return the metadata file selected by the command-line options, or None if disabled."""
+    return None if args.force_download else args.download_metadata
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Lightweight timing, counter and profiling hooks for the work/ scripts.
+
+Instrumentation is off unless the GLAZE_METRICS environment variable names a
+log file. Then every timer() block is recorded per stage, and when each
+process exits (including extraction and download workers) one JSON line per
+stage is appended to the log with the call count, total time, p50/p95/max
+latency, bytes processed, throughput, other counters, the stage's memory and
+the process's peak RSS. When disabled the hooks cost one flag check.
+
+A stage's memory (stage_rss_mb) is the most RSS any one call grew by over
+its value at entry, measured by resetting the kernel's RSS high-water mark
+when the call starts (Linux only; elsewhere it is left out). This counts
+Pillow and NumPy buffers that tracemalloc would miss. Calls running at the
+same time in threads are charged for each other's memory.
+
+Setting GLAZE_PROFILE=cprofile (or pyinstrument, if installed) also profiles
+the main process from the moment this module is imported and writes
+<script>-<pid>.prof (or .html) into GLAZE_PROFILE_DIR, default the current
+directory.
+
+Usage:
+    GLAZE_METRICS=metrics.jsonl python extract_glaze_colors.py
+    python metrics.py metrics.jsonl
+"""
+
+import argparse
+import atexit
+import json
+import os
+import resource
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from multiprocessing import util
+
+METRICS_ENV = 'GLAZE_METRICS'
+PROFILE_ENV = 'GLAZE_PROFILE'
+PROFILE_DIR_ENV = 'GLAZE_PROFILE_DIR'
+
+METRICS_FILE = os.environ.get(METRICS_ENV)
+ENABLED = bool(METRICS_FILE)
+
+# Per-process measurements: stage -> {'durations': [...], 'counters': {...}, 'rss_kb': ...}
+_stages = {}
+_flush_registered_pid = None
+_lock = threading.Lock()
+
+# Stage memory: the timer calls still running, and the process peak from before each high-water reset
+_track_memory = ENABLED
+_open_frames = []
+_frames_pid = None
+_peak_rss_kb = 0
+
+def _stage(name):
+    """Return the measurement record for a stage, registering the exit flush on first use."""
+    global _flush_registered_pid
+    if _flush_registered_pid != os.getpid():
+        # Forked workers start with a copy of the parent's measurements and skip
+        # atexit, so reset them and also flush from multiprocessing's exit hook
+        _stages.clear()
+        _flush_registered_pid = os.getpid()
+        atexit.register(flush)
+        util.Finalize(None, flush, exitpriority=10)
+    return _stages.setdefault(name, {'durations': [], 'counters': {}, 'rss_kb': None})
+
+def _rss_kb():
+    """Return this process's (current, high-water) RSS in kB, or None where /proc is unavailable."""
+    try:
+        with open('/proc/self/status', 'rb') as f:
+            status = f.read()
+    except OSError:
+        return None
+    fields = dict(line.split(b':', 1) for line in status.splitlines() if line.startswith((b'VmRSS:', b'VmHWM:')))
+    return int(fields[b'VmRSS'].split()[0]), int(fields[b'VmHWM'].split()[0])
+
+def _reset_rss_peak():
+    """Reset the RSS high-water mark to the current RSS; return False where that is unsupported."""
+    try:
+        with open('/proc/self/clear_refs', 'w', encoding='ascii') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+def _enter_frame():
+    """Start measuring a call's memory and return its frame, or None if stage memory is unsupported."""
+    global _track_memory, _frames_pid, _peak_rss_kb
+    rss = _rss_kb()
+    with _lock:
+        if _frames_pid != os.getpid():
+            # Forked workers inherit the parent's open calls but never finish them
+            _open_frames.clear()
+            _frames_pid = os.getpid()
+        if rss is None or not _reset_rss_peak():
+            _track_memory = False
+            return None
+
+        # Calls already running keep the peak the reset is about to discard
+        current, peak = rss
+        _peak_rss_kb = max(_peak_rss_kb, peak)
+        for frame in _open_frames:
+            frame['peak'] = max(frame['peak'], peak)
+
+        frame = {'start': current, 'peak': current}
+        _open_frames.append(frame)
+    return frame
+
+def _exit_frame(frame):
+    """Finish measuring a call's memory and return how far its RSS grew over its entry, in kB."""
+    global _peak_rss_kb
+    rss = _rss_kb()
+    with _lock:
+        if frame in _open_frames:
+            _open_frames.remove(frame)
+        peak = max(frame['peak'], rss[1] if rss else 0)
+        _peak_rss_kb = max(_peak_rss_kb, peak)
+        for other in _open_frames:
+            other['peak'] = max(other['peak'], peak)
+    return peak - frame['start']
+
+@contextmanager
+def timer(stage):
+    """Time a block of code as one call of a stage."""
+    if not ENABLED:
+        yield
+        return
+
+    frame = _enter_frame() if _track_memory else None
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        record = _stage(stage)
+        record['durations'].append(elapsed)
+        if frame is not None:
+            record['rss_kb'] = max(record['rss_kb'] or 0, _exit_frame(frame))
+
+def timed(stage):
+    """Decorator that times every call of a function as one call of a stage."""
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            with timer(stage):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def count(stage, name, value=1):
+    """Add to a named counter of a stage, e.g. count('download', 'bytes', size)."""
+    if ENABLED:
+        with _lock:
+            counters = _stage(stage)['counters']
+            counters[name] = counters.get(name, 0) + value
+
+def percentile(sorted_values, fraction):
+    """Return the nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+def peak_rss_mb():
+    """Return this process's peak resident set size in MB, including peaks from before a stage reset it."""
+    rss = _rss_kb()
+    if rss is not None:
+        return max(_peak_rss_kb, rss[1]) / 1024
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def summarize(stage, record):
+    """Return the JSON-lines summary for one stage's measurements."""
+    durations = sorted(record['durations'])
+    total = sum(durations)
+    summary = {
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'script': os.path.basename(sys.argv[0]),
+        'pid': os.getpid(),
+        'stage': stage,
+        'count': len(durations),
+        'total_s': round(total, 6),
+        'p50_ms': round(percentile(durations, 0.50) * 1000, 3),
+        'p95_ms': round(percentile(durations, 0.95) * 1000, 3),
+        'max_ms': round(durations[-1] * 1000, 3) if durations else 0.0,
+        'peak_rss_mb': round(peak_rss_mb(), 1)
+    }
+    if record['rss_kb'] is not None:
+        summary['stage_rss_mb'] = round(record['rss_kb'] / 1024, 1)
+    summary.update(record['counters'])
+    if 'bytes' in record['counters'] and total:
+        summary['mb_per_s'] = round(record['counters']['bytes'] / total / (1024 * 1024), 3)
+    return summary
+
+def flush():
+    """Append a summary line per stage to the metrics log and reset the measurements."""
+    if not (ENABLED and _stages):
+        return
+
+    lines = [json.dumps(summarize(stage, record), sort_keys=True) for stage, record in sorted(_stages.items())]
+    _stages.clear()
+
+    # One write per process so lines from concurrent workers don't interleave
+    with open(METRICS_FILE, 'a', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+
+def _start_profiler():
+    """Start the profiler selected by GLAZE_PROFILE and dump its results when the main process exits."""
+    kind = os.environ.get(PROFILE_ENV, '').lower()
+    if not kind:
+        return
+
+    output_dir = os.environ.get(PROFILE_DIR_ENV, '.')
+    script = os.path.splitext(os.path.basename(sys.argv[0]))[0] or 'python'
+    pid = os.getpid()
+
+    if kind == 'pyinstrument':
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            print(f"{PROFILE_ENV}=pyinstrument but pyinstrument is not installed, profiling disabled")
+            return
+        profiler = Profiler()
+        profiler.start()
+
+        def dump():
+            if os.getpid() == pid:
+                profiler.stop()
+                with open(os.path.join(output_dir, f"{script}-{pid}.html"), 'w', encoding='utf-8') as f:
+                    f.write(profiler.output_html())
+    else:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+        def dump():
+            if os.getpid() == pid:
+                profiler.disable()
+                profiler.dump_stats(os.path.join(output_dir, f"{script}-{pid}.prof"))
+
+    atexit.register(dump)
+
+_start_profiler()
+
+def main():
+    """Main function to print a metrics log as a table."""
+    parser = argparse.ArgumentParser(description=__doc__.strip(), formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('log', nargs='?', default=METRICS_FILE or 'metrics.jsonl',
+                        help=f'Metrics log to read (default: ${METRICS_ENV} or metrics.jsonl)')
+    args = parser.parse_args()
+
+    with open(args.log, 'r', encoding='utf-8') as f:
+        lines = [json.loads(line) for line in f if line.strip()]
+
+    print(f"{'script':<32} {'pid':>7} {'stage':<14} {'count':>7} {'total s':>9} "
+          f"{'p50 ms':>9} {'p95 ms':>9} {'MB/s':>8} {'stage MB':>8} {'proc MB':>8}")
+    for line in lines:
+        mb_per_s = f"{line['mb_per_s']:.2f}" if 'mb_per_s' in line else '-'
+        stage_mb = f"{line['stage_rss_mb']:.1f}" if 'stage_rss_mb' in line else '-'
+        print(f"{line['script']:<32} {line['pid']:>7} {line['stage']:<14} {line['count']:>7} "
+              f"{line['total_s']:>9.3f} {line['p50_ms']:>9.2f} {line['p95_ms']:>9.2f} "
+              f"{mb_per_s:>8} {stage_mb:>8} {line['peak_rss_mb']:>8.1f}")
+
+if __name__ == "__main__":
+    main()
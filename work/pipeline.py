@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Script to run the catalog build as a dependency graph, rebuilding only what changed.
+
+Stages: scrape -> download -> thumbnails -> extract -> CSV -> JSON -> SVG. Each stage
+lists its input files, command-line parameters and the code it runs. A
+stage is rebuilt, make-style, only when the fingerprint of those changes or
+one of its outputs is missing. Independent branches, such as glazes and
+underglazes, run concurrently. Fingerprints are kept in .pipeline_state.json.
+
+colors.json is written to the served copy at the repository root
+(--colors-json, default ../colors.json), and the stages that read it use the
+same file.
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+DEFAULT_STATE_FILE = '.pipeline_state.json'
+DEFAULT_COLORS_JSON = os.path.join('..', 'colors.json')
+
+# Scripts live next to this file; data paths are relative to the working directory
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+SCRAPE_CODE = ['catalog_parser.py', 'catalog_index.py', 'image_downloader.py', 'catalog_db.py', 'state_file.py']
+EXTRACT_CODE = ['color_sampling.py', 'batch_extract.py', 'extraction_cache.py', 'report_writer.py', 'swatches.css',
+                'build_thumbnails.py', 'dominant_colors.py', 'region_sampler.py', 'catalog_db.py', 'state_file.py']
+SVG_CODE = ['swatch_layout.py', 'swatch_svg.py']
+RASTER_CODE = ['swatch_layout.py']
+
+def csv_images(csv_file):
+    """Return the local image paths listed in a scraper CSV, so swatch changes trigger rebuilds."""
+    def images():
+        if not os.path.exists(csv_file):
+            return []
+        with open(csv_file, 'r', encoding='utf-8') as f:
+            return [
+                row['local_image_path'] for row in csv.DictReader(f)
+                if row['local_image_path'] and row['local_image_path'] != 'DOWNLOAD_FAILED'
+            ]
+    return images
+
+# Stage name -> script, arguments, dependencies, inputs, outputs and extra code files
+STAGES = {
+    'scrape_glazes': {
+        'script': 'extract_glazes_cone06.py',
+        'deps': [],
+        'inputs': ['glazes.html'],
+        'outputs': ['glazes_cone06.csv'],
+        'code': SCRAPE_CODE
+    },
+    'scrape_underglazes': {
+        'script': 'extract_underglazes.py',
+        'deps': [],
+        'inputs': ['underglazes.html'],
+        'outputs': ['underglazes_cone06.csv'],
+        'code': SCRAPE_CODE
+    },
+    'thumbnails': {
+        'script': 'build_thumbnails.py',
+        'deps': ['scrape_glazes', 'scrape_underglazes'],
+        'inputs': [csv_images('glazes_cone06.csv'), csv_images('underglazes_cone06.csv')],
+        'outputs': [],
+        'code': []
+    },
+    'extract_glazes': {
+        'script': 'extract_glaze_colors.py',
+        'deps': ['scrape_glazes', 'thumbnails'],
+        'inputs': ['glazes_cone06.csv', csv_images('glazes_cone06.csv')],
+        'outputs': ['glaze_colors.csv', 'glaze_colors.html'],
+        'code': EXTRACT_CODE
+    },
+    'extract_underglazes': {
+        'script': 'extract_colors_with_images.py',
+        'deps': ['scrape_underglazes', 'thumbnails'],
+        'inputs': ['underglazes_cone06.csv', csv_images('underglazes_cone06.csv')],
+        'outputs': ['underglaze_colors.csv', 'underglaze_colors.html'],
+        'code': EXTRACT_CODE
+    },
+    'colors_json': {
+        'script': 'create_colors_json.py',
+        'deps': ['extract_glazes', 'extract_underglazes', 'thumbnails'],
+        'inputs': ['glaze_colors.csv', 'underglaze_colors.csv', 'glazes_cone06.csv', 'underglazes_cone06.csv'],
+        'outputs': ['colors.json'],
+        'code': ['build_thumbnails.py', 'catalog_db.py', 'dominant_colors.py']
+    },
+    'combinations': {
+        'script': 'combination_matrix.py',
+        'deps': ['colors_json'],
+        'inputs': ['colors.json'],
+        'outputs': ['combinations.bin'],
+        'code': ['color_index.py']
+    },
+    'catalog_pack': {
+        'script': 'catalog_pack.py',
+        'deps': ['colors_json'],
+        'inputs': ['colors.json'],
+        'outputs': ['colors.bin', 'colors.min.json', 'colors.min.json.gz'],
+        'code': []
+    },
+    'underglaze_svg': {
+        'script': 'create_color_svg.py',
+        'deps': ['extract_underglazes'],
+        'inputs': ['underglaze_colors.csv'],
+        'outputs': ['underglaze_colors.svg'],
+        'code': SVG_CODE
+    },
+    'underglaze_compact_svg': {
+        'script': 'create_compact_svg.py',
+        'deps': ['extract_underglazes'],
+        'inputs': ['underglaze_colors.csv'],
+        'outputs': ['underglaze_colors_compact.svg'],
+        'code': SVG_CODE
+    },
+    'glaze_compact_svg': {
+        'script': 'create_glaze_compact_svg.py',
+        'deps': ['extract_glazes'],
+        'inputs': ['glaze_colors.csv'],
+        'outputs': ['glaze_colors_compact.svg'],
+        'code': SVG_CODE
+    },
+    'catalog_png': {
+        'script': 'swatch_raster.py',
+        'deps': ['colors_json'],
+        'inputs': ['colors.json'],
+        'outputs': ['catalog_swatches.png'],
+        'code': RASTER_CODE
+    }
+}
+
+# Stage -> option that names the colors.json it writes or reads
+COLORS_JSON_OPTIONS = {
+    'colors_json': '--output',
+    'combinations': '--colors',
+    'catalog_pack': '--colors',
+    'catalog_png': '--colors'
+}
+
+def use_colors_json(colors_file, stage_args):
+    """Point the stages that write or read colors.json at colors_file, adding their options to stage_args."""
+    for name, option in COLORS_JSON_OPTIONS.items():
+        stage = STAGES[name]
+        stage['inputs'] = [colors_file if path == 'colors.json' else path for path in stage['inputs']]
+        stage['outputs'] = [colors_file if path == 'colors.json' else path for path in stage['outputs']]
+        stage_args.setdefault(name, []).extend([option, colors_file])
+
+def load_state(state_file=DEFAULT_STATE_FILE):
+    """Load stage fingerprints and the file hash memo from disk."""
+    try:
+        with open(state_file, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        state = {}
+    state.setdefault('stages', {})
+    state.setdefault('files', {})
+    return state
+
+def save_state(state, state_file=DEFAULT_STATE_FILE):
+    """Write stage fingerprints atomically."""
+    tmp_file = f"{state_file}.tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp_file, state_file)
+
+def file_digest(path, memo):
+    """Return a content hash for a file, reusing the memo while its size and mtime are unchanged."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+
+    signature = [stat.st_size, stat.st_mtime_ns]
+    cached = memo.get(path)
+    if cached and cached['signature'] == signature:
+        return cached['sha256']
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+
+    memo[path] = {'signature': signature, 'sha256': digest.hexdigest()}
+    return memo[path]['sha256']
+
+def stage_inputs(stage):
+    """Return the input file paths of a stage, expanding dynamic input lists."""
+    paths = []
+    for item in stage['inputs']:
+        paths.extend(item() if callable(item) else [item])
+    return paths
+
+def stage_fingerprint(name, stage, args, memo):
+    """Return a hash of a stage's inputs, parameters and code."""
+    code = [os.path.join(SCRIPT_DIR, path) for path in [stage['script']] + stage['code']]
+    payload = {
+        'stage': name,
+        'args': args,
+        'inputs': {path: file_digest(path, memo) for path in sorted(set(stage_inputs(stage)))},
+        'code': {os.path.basename(path): file_digest(path, memo) for path in code}
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+
+def needs_rebuild(name, stage, fingerprint, state):
+    """Return the reason a stage must run, or None if it is up to date."""
+    missing = [path for path in stage['outputs'] if not os.path.exists(path)]
+    if missing:
+        return f"missing {', '.join(missing)}"
+    if state['stages'].get(name) != fingerprint:
+        return 'inputs changed'
+    return None
+
+def select_stages(targets):
+    """Return the target stages plus everything they depend on."""
+    selected = set()
+    pending = list(targets or STAGES)
+    while pending:
+        name = pending.pop()
+        if name not in STAGES:
+            raise SystemExit(f"Unknown stage: {name} (choose from {', '.join(STAGES)})")
+        if name not in selected:
+            selected.add(name)
+            pending.extend(STAGES[name]['deps'])
+    return selected
+
+def run_stage(name, stage, args):
+    """Run a stage's script and return (name, return code, seconds)."""
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, os.path.join(SCRIPT_DIR, stage['script'])] + args)
+    return name, result.returncode, time.perf_counter() - start
+
+def touch_stages(names, stage_args=None, state_file=DEFAULT_STATE_FILE):
+    """Record the current fingerprint of stages as up to date without running them."""
+    stage_args = stage_args or {}
+    state = load_state(state_file)
+    for name in names:
+        if name not in STAGES:
+            raise SystemExit(f"Unknown stage: {name} (choose from {', '.join(STAGES)})")
+        state['stages'][name] = stage_fingerprint(name, STAGES[name], stage_args.get(name, []), state['files'])
+        print(f"[touched] {name}")
+    save_state(state, state_file)
+
+def run_pipeline(targets=None, stage_args=None, jobs=None, force=False, dry_run=False,
+                 state_file=DEFAULT_STATE_FILE):
+    """Run the selected stages in dependency order and return True if all succeeded."""
+    stage_args = stage_args or {}
+    selected = select_stages(targets)
+    state = load_state(state_file)
+
+    done = set()
+    failed = set()
+    would_run = set()
+    running = {}
+    fingerprints = {}
+
+    with ThreadPoolExecutor(max_workers=jobs or len(selected)) as executor:
+        while len(done) + len(failed) < len(selected):
+            # Start every stage whose dependencies have finished
+            for name in sorted(selected - done - failed - set(running.values())):
+                stage = STAGES[name]
+                deps = [dep for dep in stage['deps'] if dep in selected]
+                if any(dep in failed for dep in deps):
+                    print(f"[skip] {name}: dependency failed")
+                    failed.add(name)
+                    continue
+                if not all(dep in done for dep in deps):
+                    continue
+
+                args = stage_args.get(name, [])
+                fingerprints[name] = stage_fingerprint(name, stage, args, state['files'])
+                reason = 'forced' if force else needs_rebuild(name, stage, fingerprints[name], state)
+                if not reason and any(dep in would_run for dep in deps):
+                    reason = 'dependency would run'
+
+                if not reason:
+                    print(f"[up to date] {name}")
+                    done.add(name)
+                elif dry_run:
+                    print(f"[would run] {name}: {reason}")
+                    would_run.add(name)
+                    done.add(name)
+                else:
+                    print(f"[run] {name}: {reason}")
+                    running[executor.submit(run_stage, name, stage, args)] = name
+
+            if not running:
+                continue
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name, returncode, elapsed = future.result()
+                del running[future]
+                if returncode == 0:
+                    print(f"[done] {name} in {elapsed:.1f}s")
+                    state['stages'][name] = fingerprints[name]
+                    done.add(name)
+                else:
+                    print(f"[failed] {name} (exit code {returncode})")
+                    failed.add(name)
+
+            save_state(state, state_file)
+
+    if not dry_run:
+        save_state(state, state_file)
+    return not failed
+
+def main():
+    """Main function to run the pipeline from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('targets', nargs='*',
+                        help=f"Stages to bring up to date, with their dependencies (default: all). "
+                             f"Stages: {', '.join(STAGES)}")
+    parser.add_argument('--jobs', type=int,
+                        help='Maximum number of stages to run at once (default: as many as are ready)')
+    parser.add_argument('--force', action='store_true',
+                        help='Run every selected stage even if it is up to date')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Print which stages would run without running them')
+    parser.add_argument('--touch', action='store_true',
+                        help='Mark the given stages as up to date without running them (like make -t)')
+    parser.add_argument('--workers', type=int,
+                        help='Pass --workers N to the color extraction stages')
+    parser.add_argument('--dominant', type=int, metavar='K',
+                        help='Pass --dominant K to the color extraction stages')
+    parser.add_argument('--colors-json', default=DEFAULT_COLORS_JSON,
+                        help=f'colors.json to write and build the catalog files from (default: {DEFAULT_COLORS_JSON})')
+    parser.add_argument('--state-file', default=DEFAULT_STATE_FILE,
+                        help=f'Stage fingerprint file (default: {DEFAULT_STATE_FILE})')
+    args = parser.parse_args()
+
+    stage_args = {}
+    for name in ('extract_glazes', 'extract_underglazes'):
+        if args.workers:
+            stage_args.setdefault(name, []).extend(['--workers', str(args.workers)])
+        if args.dominant:
+            stage_args.setdefault(name, []).extend(['--dominant', str(args.dominant)])
+    use_colors_json(args.colors_json, stage_args)
+
+    if args.touch:
+        touch_stages(args.targets or list(STAGES), stage_args, args.state_file)
+        return
+    
+    success = run_pipeline(args.targets, stage_args, jobs=args.jobs, force=args.force,
+                           dry_run=args.dry_run, state_file=args.state_file)
+    sys.exit(0 if success else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Streaming HTML report writer for glaze and underglaze swatch pages.
+
+Rows are rendered from precompiled templates and written to the output file
+as soon as each color is extracted, so memory stays constant and the page
+can be opened while a long run is still going. Styling lives in a shared
+external stylesheet (swatches.css) instead of being inlined into each page.
+Images use the responsive thumbnails from build_thumbnails.py when present.
+"""
+
+import html
+import os
+import shutil
+from string import Template
+
+from build_thumbnails import image_markup
+from metrics import count, timed
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+STYLESHEET = 'swatches.css'
+
+HEADER_TEMPLATE = Template("""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>$title</title>
+    <link rel="stylesheet" href="$stylesheet">
+</head>
+<body>
+    <div class="container">
+        <h1>$title</h1>
+        <p class="description">
+            $description
+        </p>
+        <div class="color-grid">
+""")
+
+ROW_TEMPLATE = Template("""            <div class="color-item">
+                <div class="color-header">
+                    <div class="color-name">$color_name</div>
+                    <div class="color-code">$code</div>
+                </div>
+                <div class="image-and-colors">
+                    <div class="original-image">
+                        $image
+                        <div class="image-caption">Original Sample</div>
+                    </div>
+                    <div class="color-swatches">
+                        <div class="color-swatch-row">
+                            <div class="color-swatch" style="background-color: $left_hex;" title="$left_hex">
+                                <div class="position-label">L</div>
+                            </div>
+                            <div class="color-info">
+                                <div><span class="hex-code">$left_hex</span></div>
+                                <div class="position-note">45% width, 55% height</div>
+                            </div>
+                        </div>
+                        <div class="color-swatch-row">
+                            <div class="color-swatch" style="background-color: $top_hex;" title="$top_hex">
+                                <div class="position-label">T</div>
+                            </div>
+                            <div class="color-info">
+                                <div><span class="hex-code">$top_hex</span></div>
+                                <div class="position-note">Top position</div>
+                            </div>
+                        </div>
+                    </div>
+                </div>
+            </div>
+""")
+
+FOOTER = """        </div>
+    </div>
+</body>
+</html>
+"""
+
+def rgb_to_hex(rgb):
+    """Convert RGB tuple to hex color string."""
+    return f"#{rgb[0]:02x}{rgb[1]:02x}{rgb[2]:02x}"
+
+def install_stylesheet(output_file, stylesheet=STYLESHEET):
+    """Copy the shared stylesheet next to the output page if it isn't there already."""
+    source = os.path.join(SCRIPT_DIR, stylesheet)
+    target = os.path.join(os.path.dirname(os.path.abspath(output_file)), stylesheet)
+    if not os.path.exists(target) or not os.path.samefile(source, target):
+        shutil.copyfile(source, target)
+
+class ReportWriter:
+    """Write a swatch page row by row, flushing after each row.
+
+    Use as a context manager:
+
+        with ReportWriter('glaze_colors.html', 'Mayco Glaze Colors - Cone 06', description, 'glaze') as report:
+            report.write_row(item)
+    """
+
+    def __init__(self, output_file, title, description, kind, stylesheet=STYLESHEET):
+        self.output_file = output_file
+        self.title = title
+        self.description = description
+        self.kind = kind
+        self.stylesheet = stylesheet
+        self.file = None
+        self.rows = 0
+
+    def __enter__(self):
+        install_stylesheet(self.output_file, self.stylesheet)
+        self.file = open(self.output_file, 'w', encoding='utf-8')
+        self.file.write(HEADER_TEMPLATE.substitute(
+            title=html.escape(self.title),
+            stylesheet=html.escape(self.stylesheet),
+            description=html.escape(self.description)
+        ))
+        self.file.flush()
+        return self
+
+    @timed('write_html')
+    def write_row(self, item):
+        """Write one swatch row; items without both colors are skipped."""
+        if not (item['left_color'] and item['top_color']):
+            return
+
+        row = ROW_TEMPLATE.substitute(
+            color_name=html.escape(item['color_name']),
+            code=html.escape(item['code']),
+            image=image_markup(item['image_path'], f"{item['color_name']} {self.kind} sample"),
+            left_hex=rgb_to_hex(item['left_color']),
+            top_hex=rgb_to_hex(item['top_color'])
+        )
+        self.file.write(row)
+        self.file.flush()
+        count('write_html', 'bytes', len(row.encode('utf-8')))
+        self.rows += 1
+
+    def close(self):
+        """Finish the page and close the file."""
+        if self.file:
+            self.file.write(FOOTER)
+            self.file.close()
+            self.file = None
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
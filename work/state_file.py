@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Read-modify-write of the JSON state files that concurrent pipeline stages share.
+
+The extraction cache and the download metadata are each loaded at the start
+of a run and saved at its end, and the glaze and underglaze stages run at
+the same time. Saving therefore merges into what is on disk under an
+exclusive lock, and writes through a uniquely named temporary file, so one
+stage never overwrites the other's entries or renames its half-written file.
+"""
+
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, writes are still atomic
+    fcntl = None
+
+@contextmanager
+def locked(path):
+    """Hold an exclusive lock on path's .lock file for the duration of the block."""
+    if fcntl is None:
+        yield
+        return
+
+    with open(f"{path}.lock", 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def read_json(path):
+    """Return the parsed JSON in path, or {} if it is missing or unreadable."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def write_json(path, data, **dump_args):
+    """Write data to path atomically through a temporary file no other writer uses."""
+    fd, tmp_file = tempfile.mkstemp(prefix=f"{os.path.basename(path)}.", suffix='.tmp',
+                                    dir=os.path.dirname(path) or '.')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, **dump_args)
+        os.replace(tmp_file, path)
+    except BaseException:
+        os.remove(tmp_file)
+        raise
+
+def update_json(path, merge, **dump_args):
+    """Replace path's JSON with merge(current JSON) while holding its lock."""
+    with locked(path):
+        write_json(path, merge(read_json(path)), **dump_args)
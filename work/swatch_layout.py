@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Grid layouts for swatch sheets, shared by the SVG and raster renderers.
+
+A layout describes one cell of the grid in cell-relative coordinates: the
+swatch squares and which color field fills each, the text fields, and the
+static labels that are the same in every cell. The sheet is a title header
+followed by cells laid out row by row. Renderers only have to know how to
+draw a rect and a text in a given style; all positions come from here.
+
+Layouts:
+    full     name, code, two large swatches with hex codes and position notes
+    compact  name, code, two small swatches with hex codes
+    tiny     one small swatch per color with its code underneath
+"""
+
+import csv
+import json
+
+# Text styles: font family, size in px, weight, fill and anchor
+STYLES = {
+    'full': {
+        'title': {'font': 'sans', 'size': 24, 'bold': True, 'fill': '#333', 'anchor': 'middle'},
+        'subtitle': {'font': 'sans', 'size': 14, 'bold': False, 'fill': '#666', 'anchor': 'middle'},
+        'name': {'font': 'sans', 'size': 14, 'bold': True, 'fill': '#333', 'anchor': 'start'},
+        'code': {'font': 'sans', 'size': 12, 'bold': False, 'fill': '#666', 'anchor': 'start'},
+        'hex': {'font': 'mono', 'size': 11, 'bold': False, 'fill': '#333', 'anchor': 'start'},
+        'label': {'font': 'sans', 'size': 10, 'bold': False, 'fill': '#888', 'anchor': 'middle'},
+        'note': {'font': 'sans', 'size': 10, 'bold': False, 'fill': '#888', 'anchor': 'middle'}
+    },
+    'compact': {
+        'title': {'font': 'sans', 'size': 20, 'bold': True, 'fill': '#333', 'anchor': 'middle'},
+        'subtitle': {'font': 'sans', 'size': 12, 'bold': False, 'fill': '#666', 'anchor': 'middle'},
+        'name': {'font': 'sans', 'size': 11, 'bold': True, 'fill': '#333', 'anchor': 'start'},
+        'code': {'font': 'sans', 'size': 9, 'bold': False, 'fill': '#666', 'anchor': 'start'},
+        'hex': {'font': 'mono', 'size': 8, 'bold': False, 'fill': '#333', 'anchor': 'start'}
+    },
+    'tiny': {
+        'title': {'font': 'sans', 'size': 16, 'bold': True, 'fill': '#000', 'anchor': 'middle'},
+        'code': {'font': 'sans', 'size': 8, 'bold': False, 'fill': '#000', 'anchor': 'middle'}
+    }
+}
+
+LAYOUTS = {
+    'full': {
+        'columns': 6,
+        'cell_width': 200,
+        'cell_height': 200,
+        'column_gap': 20,
+        'row_gap': 0,
+        'margin': 20,
+        'header': 80,
+        'title_y': 30,
+        'subtitle_y': 50,
+        'subtitle': 'Color samples: 45% width/55% height and top middle positions',
+        'swatch_size': 60,
+        'swatch_stroke': ('#ccc', 1),
+        'border': None,
+        # (x, y, field) for each swatch square
+        'swatches': [(10, 40, 'left_color_hex'), (10, 120, 'top_color_hex')],
+        # (x, y, field, style) for each per-color text
+        'texts': [
+            (10, 15, 'color_name', 'name'),
+            (10, 30, 'code', 'code'),
+            (80, 55, 'left_color_hex', 'hex'),
+            (80, 135, 'top_color_hex', 'hex')
+        ],
+        # (x, y, text, style) for text repeated in every cell
+        'labels': [
+            (40, 112, 'L', 'label'),
+            (80, 70, '45% w, 55% h', 'note'),
+            (40, 192, 'T', 'label'),
+            (80, 150, 'Top middle', 'note')
+        ],
+        'styles': STYLES['full']
+    },
+    'compact': {
+        'columns': 8,
+        'cell_width': 150,
+        'cell_height': 125,
+        'column_gap': 15,
+        'row_gap': 0,
+        'margin': 15,
+        'header': 60,
+        'title_y': 25,
+        'subtitle_y': 40,
+        'subtitle': 'L: 45% w/55% h | T: Top middle',
+        'swatch_size': 40,
+        'swatch_stroke': ('#ccc', 0.5),
+        'border': None,
+        'swatches': [(5, 25, 'left_color_hex'), (5, 70, 'top_color_hex')],
+        'texts': [
+            (5, 10, 'color_name', 'name'),
+            (5, 20, 'code', 'code'),
+            (50, 37, 'left_color_hex', 'hex'),
+            (50, 82, 'top_color_hex', 'hex')
+        ],
+        'labels': [],
+        'styles': STYLES['compact']
+    },
+    'tiny': {
+        'columns': 20,
+        'cell_width': 20,
+        'cell_height': 35,
+        'column_gap': 2,
+        'row_gap': 2,
+        'margin': 10,
+        'header': 40,
+        'title_y': 20,
+        'subtitle_y': None,
+        'subtitle': None,
+        'swatch_size': 20,
+        'swatch_stroke': ('#000', 0.5),
+        'border': ('#000', 1),
+        'swatches': [(0, 0, 'left_color_hex')],
+        'texts': [(10, 35, 'code', 'code')],
+        'labels': [],
+        'styles': STYLES['tiny']
+    }
+}
+
+def get_layout(name, columns=None):
+    """Return a copy of a named layout, optionally with a different number of columns."""
+    if name not in LAYOUTS:
+        raise ValueError(f"layout must be one of {tuple(LAYOUTS)}, got {name}")
+    layout = dict(LAYOUTS[name])
+    if columns:
+        layout['columns'] = columns
+    return layout
+
+def grid_rows(layout, count):
+    """Return the number of rows needed for count cells."""
+    return (count + layout['columns'] - 1) // layout['columns']
+
+def sheet_size(layout, count):
+    """Return the (width, height) of a sheet holding count cells."""
+    columns = layout['columns']
+    rows = grid_rows(layout, count)
+    width = 2 * layout['margin'] + columns * layout['cell_width'] + (columns - 1) * layout['column_gap']
+    height = layout['header'] + rows * layout['cell_height'] + max(rows - 1, 0) * layout['row_gap'] + layout['margin']
+    return width, height
+
+def cell_origin(layout, index):
+    """Return the top-left (x, y) of the cell at a grid index."""
+    row, column = divmod(index, layout['columns'])
+    x = layout['margin'] + column * (layout['cell_width'] + layout['column_gap'])
+    y = layout['header'] + row * (layout['cell_height'] + layout['row_gap'])
+    return x, y
+
+def item_from_row(row):
+    """Return a swatch item from an extracted colors CSV row, or None if a color is missing."""
+    if not (row.get('left_color_hex') and row.get('top_color_hex')):
+        return None
+    return {
+        'code': row['code'],
+        'color_name': row['color_name'],
+        'left_color_hex': row['left_color_hex'],
+        'top_color_hex': row['top_color_hex']
+    }
+
+def load_items(csv_file):
+    """Read swatch items from an extracted colors CSV (glaze_colors.csv or underglaze_colors.csv)."""
+    with open(csv_file, 'r', encoding='utf-8') as f:
+        return [item for item in map(item_from_row, csv.DictReader(f)) if item]
+
+def load_catalog_items(colors_file='colors.json'):
+    """Read swatch items for every glaze and underglaze in colors.json, across all brands."""
+    with open(colors_file, 'r', encoding='utf-8') as f:
+        colors_data = json.load(f)
+
+    items = []
+    for glaze in colors_data.get('glazes', []):
+        items.append({'code': glaze['id'], 'color_name': glaze['name'],
+                      'left_color_hex': glaze['color'], 'top_color_hex': glaze['color']})
+    for underglaze in colors_data.get('underglazes', []):
+        items.append({'code': underglaze['id'], 'color_name': underglaze['name'],
+                      'left_color_hex': underglaze['left'], 'top_color_hex': underglaze['top']})
+    return items
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Script to render swatch sheets straight to PNG or multi-page PDF with Pillow.
+
+Uses the same grid layouts as the SVG sheets (swatch_layout), scaled from
+CSS pixels (96 per inch) to the requested DPI. Memory stays bounded for
+sheets of any size:
+
+    PNG  the sheet is painted in horizontal strips on a pool of worker
+         processes. Each worker deflates its own strip as a raw deflate
+         segment ending on a full flush, the way pigz splits work, so the
+         segments concatenate into one valid IDAT stream. The parent only
+         writes segments in order and combines their Adler-32 checksums,
+         and the whole sheet never exists in memory.
+    PDF  the grid is split into pages that fit the paper size; pages are
+         painted in parallel and appended to the PDF one at a time.
+
+Usage:
+    python swatch_raster.py --colors colors.json --layout compact --output catalog.pdf --dpi 300
+"""
+
+import argparse
+import os
+import struct
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from metrics import count, timer
+from swatch_layout import LAYOUTS, cell_origin, get_layout, grid_rows, load_catalog_items, load_items, sheet_size
+
+CSS_DPI = 96
+DEFAULT_DPI = 300
+STRIP_HEIGHT = 1024
+PAGE_SIZES = {
+    'letter': (8.5, 11),
+    'a4': (8.27, 11.69),
+    'tabloid': (11, 17)
+}
+
+# Candidate font files per (family, bold), first one found wins
+FONT_FILES = {
+    ('sans', False): ['arial.ttf', 'Arial.ttf', 'LiberationSans-Regular.ttf', 'DejaVuSans.ttf'],
+    ('sans', True): ['arialbd.ttf', 'Arial Bold.ttf', 'LiberationSans-Bold.ttf', 'DejaVuSans-Bold.ttf'],
+    ('mono', False): ['cour.ttf', 'Courier New.ttf', 'LiberationMono-Regular.ttf', 'DejaVuSansMono.ttf'],
+    ('mono', True): ['courbd.ttf', 'Courier New Bold.ttf', 'LiberationMono-Bold.ttf', 'DejaVuSansMono-Bold.ttf']
+}
+
+ANCHORS = {'start': 'ls', 'middle': 'ms'}
+
+ADLER_BASE = 65521
+
+@lru_cache(maxsize=None)
+def load_font(family, bold, size):
+    """Return a TrueType font for a style at a pixel size, falling back to Pillow's default font."""
+    for filename in FONT_FILES[(family, bold)]:
+        try:
+            return ImageFont.truetype(filename, size)
+        except OSError:
+            continue
+    return ImageFont.load_default(size)
+
+class SheetPainter:
+    """Paint any horizontal band of a swatch sheet at a given scale."""
+
+    def __init__(self, layout, items, scale, title, subtitle=None):
+        self.layout = layout
+        self.items = items
+        self.scale = scale
+        self.title = title
+        self.subtitle = subtitle
+        width, height = sheet_size(layout, len(items))
+        self.size = (round(width * scale), round(height * scale))
+
+    def font(self, style_name):
+        """Return the font for one of the layout's text styles at this scale."""
+        style = self.layout['styles'][style_name]
+        return load_font(style['font'], style['bold'], max(1, round(style['size'] * self.scale)))
+
+    def text(self, draw, x, y, text, style_name, dx, dy):
+        """Draw text with its baseline at sheet position (x, y)."""
+        style = self.layout['styles'][style_name]
+        draw.text((round(x * self.scale) + dx, round(y * self.scale) + dy), text, font=self.font(style_name),
+                  fill=style['fill'], anchor=ANCHORS[style['anchor']])
+
+    def paint(self, image, top=0, x_offset=0):
+        """Paint the band of the sheet starting at pixel row top into image."""
+        layout = self.layout
+        scale = self.scale
+        draw = ImageDraw.Draw(image)
+        dx, dy = x_offset, -top
+        bottom = top + image.height
+        sheet_width = self.size[0] / scale
+
+        if layout['border']:
+            stroke, stroke_width = layout['border']
+            draw.rectangle([dx, dy, dx + self.size[0] - 1, dy + self.size[1] - 1], outline=stroke,
+                           width=max(1, round(stroke_width * scale)))
+
+        if top < layout['header'] * scale:
+            self.text(draw, sheet_width // 2, layout['title_y'], self.title, 'title', dx, dy)
+            if self.subtitle and layout['subtitle_y'] is not None:
+                self.text(draw, sheet_width // 2, layout['subtitle_y'], self.subtitle, 'subtitle', dx, dy)
+
+        # Only the rows that overlap this band, plus one either side for text overhang
+        pitch = (layout['cell_height'] + layout['row_gap']) * scale
+        first_row = max(0, int((top - layout['header'] * scale) // pitch) - 1)
+        last_row = min(grid_rows(layout, len(self.items)), int((bottom - layout['header'] * scale) // pitch) + 2)
+
+        size = layout['swatch_size']
+        stroke, stroke_width = layout['swatch_stroke']
+        stroke_width = max(1, round(stroke_width * scale))
+
+        for index in range(first_row * layout['columns'], min(last_row * layout['columns'], len(self.items))):
+            item = self.items[index]
+            cell_x, cell_y = cell_origin(layout, index)
+
+            for x, y, field in layout['swatches']:
+                # Round in sheet pixels before offsetting, so every band rasterizes a swatch the same way
+                left, upper = round((cell_x + x) * scale), round((cell_y + y) * scale)
+                right, lower = round((cell_x + x + size) * scale) - 1, round((cell_y + y + size) * scale) - 1
+                draw.rectangle([left + dx, upper + dy, right + dx, lower + dy], fill=item[field],
+                               outline=stroke, width=stroke_width)
+            for x, y, field, style_name in layout['texts']:
+                self.text(draw, cell_x + x, cell_y + y, item[field], style_name, dx, dy)
+            for x, y, text, style_name in layout['labels']:
+                self.text(draw, cell_x + x, cell_y + y, text, style_name, dx, dy)
+
+# Set in each worker process by _init_worker so jobs only carry band offsets
+_painter = None
+
+def _init_worker(layout, items, scale, title, subtitle):
+    """Create the sheet painter once per worker process."""
+    global _painter
+    _painter = SheetPainter(layout, items, scale, title, subtitle)
+
+def _paint_strip(band):
+    """Paint and deflate one horizontal strip; return (segment, adler32, raw length).
+
+    Scanlines use PNG filter type 0, so each is a zero byte followed by the row's RGB bytes.
+    """
+    top, height, compress_level = band
+    width = _painter.size[0]
+    image = Image.new('RGB', (width, height), 'white')
+    _painter.paint(image, top)
+
+    scanlines = np.zeros((height, 1 + 3 * width), dtype=np.uint8)
+    scanlines[:, 1:] = np.frombuffer(image.tobytes(), dtype=np.uint8).reshape(height, -1)
+    raw = scanlines.data
+
+    compressor = zlib.compressobj(compress_level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    segment = compressor.compress(raw) + compressor.flush(zlib.Z_FULL_FLUSH)
+    # raw is a 2-D memoryview, so its len() is the row count, not the byte count
+    return segment, zlib.adler32(raw), scanlines.nbytes
+
+def _paint_page(page):
+    """Paint one PDF page: a sub-sheet of the page's items centred on the paper."""
+    page_width, page_height, first, last, title = page
+    painter = SheetPainter(_painter.layout, _painter.items[first:last], _painter.scale, title, _painter.subtitle)
+    image = Image.new('RGB', (page_width, page_height), 'white')
+    painter.paint(image, 0, max(0, (page_width - painter.size[0]) // 2))
+    return image
+
+def ordered_map(executor, function, jobs, window):
+    """Like executor.map, but with at most window jobs submitted and not yet consumed.
+
+    Keeps memory bounded when results (painted pages) are large and the
+    consumer writes them more slowly than the workers produce them.
+    """
+    pending = deque()
+    for job in jobs:
+        if len(pending) >= window:
+            yield pending.popleft().result()
+        pending.append(executor.submit(function, job))
+    while pending:
+        yield pending.popleft().result()
+
+def png_chunk(chunk_type, data):
+    """Return a PNG chunk with its length and CRC."""
+    return (struct.pack('>I', len(data)) + chunk_type + data
+            + struct.pack('>I', zlib.crc32(chunk_type + data) & 0xffffffff))
+
+def adler32_combine(adler1, adler2, length2):
+    """Return the Adler-32 of two concatenated buffers from their checksums (zlib's adler32_combine)."""
+    remainder = length2 % ADLER_BASE
+    sum1 = ((adler1 & 0xffff) + (adler2 & 0xffff) - 1) % ADLER_BASE
+    sum2 = (remainder * (adler1 & 0xffff) + (adler1 >> 16) + (adler2 >> 16) - remainder) % ADLER_BASE
+    return sum1 | (sum2 << 16)
+
+def render_png(items, output_file, layout_name, title, subtitle=None, columns=None, dpi=DEFAULT_DPI,
+               workers=1, compress_level=6):
+    """Render a sheet to a PNG strip by strip and return its pixel (width, height)."""
+    layout = get_layout(layout_name, columns)
+    subtitle = subtitle if subtitle is not None else layout['subtitle']
+    scale = dpi / CSS_DPI
+    width, height = SheetPainter(layout, items, scale, title, subtitle).size
+    bands = [(top, min(STRIP_HEIGHT, height - top), compress_level) for top in range(0, height, STRIP_HEIGHT)]
+    pixels_per_metre = round(dpi / 0.0254)
+
+    with timer('write_png'), open(output_file, 'wb') as f:
+        f.write(b'\x89PNG\r\n\x1a\n')
+        f.write(png_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)))
+        f.write(png_chunk(b'pHYs', struct.pack('>IIB', pixels_per_metre, pixels_per_metre, 1)))
+
+        # zlib header (deflate, 32K window), then the strips' segments, an empty final block and the checksum
+        f.write(png_chunk(b'IDAT', b'\x78\x9c'))
+        checksum = 1
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(layout, items, scale, title, subtitle)) as executor:
+            for segment, adler, length in ordered_map(executor, _paint_strip, bands, 2 * workers):
+                f.write(png_chunk(b'IDAT', segment))
+                checksum = adler32_combine(checksum, adler, length)
+        f.write(png_chunk(b'IDAT', zlib.compressobj(0, zlib.DEFLATED, -zlib.MAX_WBITS).flush()
+                          + struct.pack('>I', checksum)))
+        f.write(png_chunk(b'IEND', b''))
+
+    count('write_png', 'bytes', os.path.getsize(output_file))
+
+    with timer('verify_png'):
+        verify_png(output_file, width, height)
+    return width, height
+
+def verify_png(png_file, width, height):
+    """Decompress a PNG's IDAT stream, raising ValueError unless it holds width x height RGB scanlines.
+
+    zlib checks the Adler-32 the strips were combined into, which Pillow
+    does not, so a bad checksum would otherwise only show in strict decoders.
+    """
+    decompressor = zlib.decompressobj()
+    length = 0
+    with open(png_file, 'rb') as f:
+        f.read(8)
+        while True:
+            chunk_length, chunk_type = struct.unpack('>I4s', f.read(8))
+            data = f.read(chunk_length)
+            f.read(4)
+            if chunk_type == b'IEND':
+                break
+            if chunk_type == b'IDAT':
+                try:
+                    # Decompress in bounded pieces so the whole image is never held in memory
+                    while data:
+                        length += len(decompressor.decompress(data, STRIP_HEIGHT * 1024))
+                        data = decompressor.unconsumed_tail
+                except zlib.error as e:
+                    raise ValueError(f"{png_file}: invalid IDAT stream: {e}") from e
+
+    expected = height * (1 + 3 * width)
+    if not decompressor.eof or length != expected:
+        raise ValueError(f"{png_file}: IDAT holds {length} bytes, expected {expected}")
+
+def paginate(layout, count_items, page_size, dpi):
+    """Return (scale, rows per page) so the grid fits the paper width and each page holds whole rows."""
+    page_width, page_height = page_size
+    sheet_width, _ = sheet_size(layout, count_items)
+    scale = min(dpi / CSS_DPI, page_width / sheet_width)
+
+    usable = page_height / scale - layout['header'] - layout['margin'] + layout['row_gap']
+    rows = max(1, int(usable // (layout['cell_height'] + layout['row_gap'])))
+    return scale, rows
+
+def render_pdf(items, output_file, layout_name, title, subtitle=None, columns=None, dpi=DEFAULT_DPI,
+               paper='letter', workers=1, quality=95):
+    """Render a sheet to a multi-page PDF at the given DPI and paper size; return the page count."""
+    layout = get_layout(layout_name, columns)
+    subtitle = subtitle if subtitle is not None else layout['subtitle']
+    page_size = tuple(round(inches * dpi) for inches in PAGE_SIZES[paper])
+    scale, rows = paginate(layout, len(items), page_size, dpi)
+
+    per_page = rows * layout['columns']
+    page_count = max(1, (len(items) + per_page - 1) // per_page)
+    pages = [
+        (page_size[0], page_size[1], first, first + per_page,
+         f"{title} ({number} of {page_count})" if page_count > 1 else title)
+        for number, first in enumerate(range(0, max(len(items), 1), per_page), start=1)
+    ]
+
+    with timer('write_pdf'):
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(layout, items, scale, title, subtitle)) as executor:
+            for number, image in enumerate(ordered_map(executor, _paint_page, pages, 2 * workers)):
+                # Append page by page so only the pages in flight are held in memory
+                image.save(output_file, 'PDF', resolution=dpi, append=number > 0,
+                           quality=quality, subsampling=0)
+
+    count('write_pdf', 'bytes', os.path.getsize(output_file))
+    return page_count
+
+def main():
+    """Main function to render a raster swatch sheet from a CSV or the whole catalog."""
+    parser = argparse.ArgumentParser(description=__doc__.strip(), formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--csv', help='Extracted colors CSV to render')
+    source.add_argument('--colors', default='colors.json', help='Catalog JSON to render (default: colors.json)')
+    parser.add_argument('--layout', choices=list(LAYOUTS), default='compact', help='Sheet layout (default: compact)')
+    parser.add_argument('--columns', type=int, help="Cells per row (default: the layout's own)")
+    parser.add_argument('--title', default='Color Catalog', help='Sheet title')
+    parser.add_argument('--output', default='catalog_swatches.png',
+                        help='PNG or PDF file to write, chosen by extension (default: catalog_swatches.png)')
+    parser.add_argument('--dpi', type=int, default=DEFAULT_DPI, help=f'Output resolution (default: {DEFAULT_DPI})')
+    parser.add_argument('--paper', choices=list(PAGE_SIZES), default='letter', help='PDF paper size (default: letter)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Number of worker processes painting strips or pages (default: one per CPU core)')
+    args = parser.parse_args()
+
+    items = load_items(args.csv) if args.csv else load_catalog_items(args.colors)
+
+    if args.output.lower().endswith('.pdf'):
+        pages = render_pdf(items, args.output, args.layout, args.title, columns=args.columns, dpi=args.dpi,
+                           paper=args.paper, workers=args.workers)
+        print(f"PDF created: {args.output}")
+        print(f"{pages} {args.paper} page(s) at {args.dpi} DPI, {len(items)} colors")
+    else:
+        width, height = render_png(items, args.output, args.layout, args.title, columns=args.columns,
+                                   dpi=args.dpi, workers=args.workers)
+        print(f"PNG created: {args.output}")
+        print(f"Dimensions: {width} x {height} pixels at {args.dpi} DPI, {len(items)} colors")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Script to render swatch sheets as minified SVG using the layouts in swatch_layout.
+
+Elements are streamed to the file one cell at a time instead of building the
+whole document in memory. Text styling lives in one CSS block keyed by short
+class names, the swatch square is a <symbol> that every cell reuses with
+<use> and its own fill, and the labels repeated in every cell are a second
+<symbol>. Only the colors, names and codes are written per cell, in
+cell-relative coordinates. Optionally a gzipped .svgz copy is written too.
+
+Usage:
+    python swatch_svg.py --colors colors.json --layout tiny --output catalog.svg --svgz
+"""
+
+import argparse
+import gzip
+import html
+import os
+import shutil
+
+from metrics import count, timer
+from swatch_layout import LAYOUTS, cell_origin, get_layout, load_catalog_items, load_items, sheet_size
+
+FONTS = {
+    'sans': 'Arial,sans-serif',
+    'mono': "'Courier New',monospace"
+}
+
+# Short CSS class name for each text style
+CLASS_NAMES = {
+    'title': 't',
+    'subtitle': 'u',
+    'name': 'n',
+    'code': 'c',
+    'hex': 'h',
+    'label': 'l',
+    'note': 'o'
+}
+
+def number(value):
+    """Format a coordinate without a trailing .0."""
+    return f"{value:g}"
+
+def style_sheet(layout):
+    """Return the minified CSS for a layout's text styles and swatch stroke."""
+    rules = []
+    for name, style in layout['styles'].items():
+        declarations = [
+            f"font:{'bold ' if style['bold'] else ''}{number(style['size'])}px {FONTS[style['font']]}",
+            f"fill:{style['fill']}"
+        ]
+        if style['anchor'] != 'start':
+            declarations.append(f"text-anchor:{style['anchor']}")
+        rules.append(f".{CLASS_NAMES[name]}{{{';'.join(declarations)}}}")
+
+    stroke, stroke_width = layout['swatch_stroke']
+    rules.append(f".s{{stroke:{stroke};stroke-width:{number(stroke_width)}}}")
+    return ''.join(rules)
+
+def text_element(x, y, text, style):
+    """Return a minified <text> element."""
+    return f'<text x="{number(x)}" y="{number(y)}" class="{CLASS_NAMES[style]}">{html.escape(text)}</text>'
+
+def svg_header(layout, width, height, title, subtitle):
+    """Return the document start: root element, styles, symbols and title."""
+    size = layout['swatch_size']
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" width="{width}" height="{height}" viewBox="0 0 {width} {height}">',
+        f'<style>{style_sheet(layout)}</style>',
+        f'<symbol id="q" overflow="visible"><rect class="s" width="{size}" height="{size}"/></symbol>'
+    ]
+    if layout['labels']:
+        labels = ''.join(text_element(x, y, text, style) for x, y, text, style in layout['labels'])
+        parts.append(f'<symbol id="k" overflow="visible">{labels}</symbol>')
+
+    if layout['border']:
+        stroke, stroke_width = layout['border']
+        parts.append(f'<rect width="{width}" height="{height}" fill="#fff" stroke="{stroke}" '
+                     f'stroke-width="{number(stroke_width)}"/>')
+
+    parts.append(text_element(width // 2, layout['title_y'], title, 'title'))
+    if subtitle and layout['subtitle_y'] is not None:
+        parts.append(text_element(width // 2, layout['subtitle_y'], subtitle, 'subtitle'))
+    return ''.join(parts)
+
+# Escapes for text content and attribute values written inside double quotes
+ESCAPES = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;'})
+
+def cell_fields(layout):
+    """Return the item fields a layout's cells show, in template order."""
+    fields = [field for _, _, field in layout['swatches']] + [field for _, _, field, _ in layout['texts']]
+    return list(dict.fromkeys(fields))
+
+def cell_template(layout):
+    """Return a str.format template for one cell with the layout's fixed coordinates baked in.
+
+    Positional arguments are the cell's x and y followed by cell_fields(layout).
+    """
+    slots = {field: index + 2 for index, field in enumerate(cell_fields(layout))}
+    parts = ['<g transform="translate({0},{1})">']
+    # xlink:href as well as href, for SVG 1.1 renderers such as older Safari and librsvg
+    if layout['labels']:
+        parts.append('<use href="#k" xlink:href="#k"/>')
+    for swatch_x, swatch_y, field in layout['swatches']:
+        parts.append(f'<use href="#q" xlink:href="#q" x="{number(swatch_x)}" y="{number(swatch_y)}" '
+                     f'fill="{{{slots[field]}}}"/>')
+    for text_x, text_y, field, style in layout['texts']:
+        parts.append(f'<text x="{number(text_x)}" y="{number(text_y)}" '
+                     f'class="{CLASS_NAMES[style]}">{{{slots[field]}}}</text>')
+    parts.append('</g>')
+    return ''.join(parts)
+
+def svg_cells(layout, items):
+    """Yield the minified markup for each item's cell."""
+    template = cell_template(layout).format
+    fields = cell_fields(layout)
+
+    for index, item in enumerate(items):
+        x, y = cell_origin(layout, index)
+        yield template(x, y, *[item[field].translate(ESCAPES) for field in fields])
+
+def svgz_path(output_file):
+    """Return the .svgz path that goes with an .svg output file."""
+    return os.path.splitext(output_file)[0] + '.svgz'
+
+def render_svg(items, output_file, layout_name, title, subtitle=None, columns=None, svgz=False):
+    """Stream a swatch sheet for items to output_file and return its (width, height).
+
+    subtitle defaults to the layout's own subtitle. With svgz=True a gzipped
+    copy is also written next to the SVG.
+    """
+    layout = get_layout(layout_name, columns)
+    width, height = sheet_size(layout, len(items))
+    subtitle = subtitle if subtitle is not None else layout['subtitle']
+
+    with timer('write_svg'):
+        with open(output_file, 'w', encoding='utf-8') as f:
+            f.write(svg_header(layout, width, height, title, subtitle))
+            f.writelines(svg_cells(layout, items))
+            f.write('</svg>')
+
+        if svgz:
+            with open(output_file, 'rb') as source, gzip.open(svgz_path(output_file), 'wb', compresslevel=9) as target:
+                shutil.copyfileobj(source, target)
+
+    count('write_svg', 'bytes', os.path.getsize(output_file))
+    return width, height
+
+def add_svg_arguments(parser, csv_file, output_file):
+    """Add the input, output and .svgz options shared by the SVG scripts."""
+    parser.add_argument('--csv', default=csv_file, help=f'Extracted colors CSV (default: {csv_file})')
+    parser.add_argument('--output', default=output_file, help=f'SVG file to write (default: {output_file})')
+    parser.add_argument('--svgz', action='store_true', help='Also write a gzipped .svgz copy')
+
+def main():
+    """Main function to render a swatch sheet from a CSV or the whole catalog."""
+    parser = argparse.ArgumentParser(description=__doc__.strip(), formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--csv', help='Extracted colors CSV to render')
+    source.add_argument('--colors', default='colors.json', help='Catalog JSON to render (default: colors.json)')
+    parser.add_argument('--layout', choices=list(LAYOUTS), default='compact', help='Sheet layout (default: compact)')
+    parser.add_argument('--columns', type=int, help="Cells per row (default: the layout's own)")
+    parser.add_argument('--title', default='Color Catalog', help='Sheet title')
+    parser.add_argument('--output', default='catalog_swatches.svg', help='SVG file to write (default: catalog_swatches.svg)')
+    parser.add_argument('--svgz', action='store_true', help='Also write a gzipped .svgz copy')
+    args = parser.parse_args()
+
+    items = load_items(args.csv) if args.csv else load_catalog_items(args.colors)
+    width, height = render_svg(items, args.output, args.layout, args.title, columns=args.columns, svgz=args.svgz)
+
+    print(f"SVG file created: {args.output}")
+    print(f"Dimensions: {width} x {height} pixels")
+    print(f"Contains {len(items)} colors")
+
+if __name__ == "__main__":
+    main()